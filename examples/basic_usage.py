@@ -13,12 +13,10 @@ from peak_valley_detector import (
     StockDataFetcher,
     HybridChangePointDetector,
     ExtremaClassifier,
-    MultiLayerVisualizer,
-    create_summary_report
 )
+from peak_valley_detector.core.extrema import local_extrema, peaks_troughs_distance
+from peak_valley_detector.utils.indicators import average_true_range
 import numpy as np
-from scipy.signal import argrelextrema
-import ta
 
 
 def basic_example():
@@ -31,6 +29,7 @@ def basic_example():
     SYMBOL = "000001"  # 平安银行
     START_DATE = "2025-01-03"  # MyQuant 权限限制：最近180天
     END_DATE = "2025-07-01"
+    BACKEND = "auto"  # 极值检测后端: "cpu" / "cuda" / "auto"
 
     print(f"分析股票: {SYMBOL}")
     print(f"起始日期: {START_DATE}\n")
@@ -91,8 +90,9 @@ def basic_example():
         
         # 3. 中观层检测 (日线)
         print("\n3. 中观层峰谷检测...")
-        mid_peaks_idx = argrelextrema(df_daily['close'].values, np.greater, order=12)[0]
-        mid_troughs_idx = argrelextrema(df_daily['close'].values, np.less, order=12)[0]
+        mid_peaks_idx, mid_troughs_idx = local_extrema(
+            df_daily['close'].values, order=12, backend=BACKEND
+        )
         
         mid_peaks_dt = df_daily.iloc[mid_peaks_idx].index
         mid_troughs_dt = df_daily.iloc[mid_troughs_idx].index
@@ -102,27 +102,30 @@ def basic_example():
         
         # 4. 微观层检测 (60分钟)
         print("\n4. 微观层峰谷检测...")
-        close_60 = h1_data['收盘']
-        atr = ta.volatility.average_true_range(
-            h1_data['最高'], h1_data['最低'], h1_data['收盘'], window=14
+        close_60 = h1_data['收盘'].values
+        atr = average_true_range(
+            h1_data['最高'].values, h1_data['最低'].values, close_60, window=14
         )
         
         # 过滤低波动区域
-        valid = atr > atr.mean() * 1.2
+        valid = atr > np.mean(atr) * 1.2
         valid_close = close_60[valid]
+        valid_index = h1_data.index[valid]
         
-        from scipy.signal import find_peaks
-        micro_peaks_idx = find_peaks(valid_close.values, distance=6)[0]
-        micro_troughs_idx = find_peaks(-valid_close.values, distance=6)[0]
+        micro_peaks_idx, micro_troughs_idx = peaks_troughs_distance(
+            valid_close, distance=6, backend=BACKEND
+        )
         
-        micro_peaks_dt = valid_close.index[micro_peaks_idx]
-        micro_troughs_dt = valid_close.index[micro_troughs_idx]
+        micro_peaks_dt = valid_index[micro_peaks_idx]
+        micro_troughs_dt = valid_index[micro_troughs_idx]
         
         print(f"   60分钟峰值: {len(micro_peaks_dt)} 个")
         print(f"   60分钟谷值: {len(micro_troughs_dt)} 个")
         
         # 5. 结果可视化
         print("\n5. 生成可视化图表...")
+        # matplotlib 导入较慢，到绘图阶段再加载
+        from peak_valley_detector import MultiLayerVisualizer, create_summary_report
         visualizer = MultiLayerVisualizer(figsize=(14, 8))
         
         # 绘制综合结果
@@ -200,6 +203,7 @@ def advanced_example():
     print(f"波动率方法检测到 {len(cp_vol)} 个变点")
     
     # 可视化比较
+    from peak_valley_detector import MultiLayerVisualizer
     visualizer = MultiLayerVisualizer()
     visualizer.plot_changepoint_analysis(
         series=series,
@@ -4,15 +4,13 @@
 """
 
 import numpy as np
-import pandas as pd
-from scipy.signal import find_peaks, argrelextrema
-import ta
 import warnings
 
 # 导入自定义模块
 from peak_valley_detector.data.fetcher import StockDataFetcher
 from peak_valley_detector.core.changepoint_detector import HybridChangePointDetector, ExtremaClassifier
-from peak_valley_detector.visualization.visualizer import MultiLayerVisualizer, create_summary_report
+from peak_valley_detector.core.extrema import local_extrema, peaks_troughs_distance
+from peak_valley_detector.utils.indicators import average_true_range
 
 warnings.filterwarnings('ignore')
 
@@ -23,6 +21,7 @@ def main():
     # ========== 1. 参数配置 ==========
     SYMBOL = "000001"  # 平安银行
     START_DATE = "2024-06-01"
+    BACKEND = "auto"  # 极值检测后端: "cpu" / "cuda" / "auto"
     
     print(f"开始分析股票 {SYMBOL}，起始日期: {START_DATE}")
     print("使用严谨的 Score-Driven BOCPD 方法进行多层次峰谷检测\n")
@@ -33,10 +32,8 @@ def main():
         source="akshare",
     )
 
-    # 获取各时间周期数据
-    df_daily = data_fetcher.get_daily(SYMBOL, start_date=START_DATE)
-    wk_series = data_fetcher.get_weekly(SYMBOL, start_date=START_DATE)
-    h1_data = data_fetcher.get_60min(SYMBOL, start_date=START_DATE)
+    # 获取各时间周期数据 (日线与60分钟并发请求，周线由日线重采样)
+    df_daily, wk_series, h1_data = data_fetcher.get_all(SYMBOL, start_date=START_DATE)
     
     print(f"日线数据: {len(df_daily)} 条")
     print(f"周线数据: {len(wk_series)} 条")
@@ -65,8 +62,9 @@ def main():
     print("=" * 50)
     
     # 使用传统方法检测日线极值点
-    mid_peaks_idx = argrelextrema(df_daily['close'].values, np.greater, order=12)[0]
-    mid_troughs_idx = argrelextrema(df_daily['close'].values, np.less, order=12)[0]
+    mid_peaks_idx, mid_troughs_idx = local_extrema(
+        df_daily['close'].values, order=12, backend=BACKEND
+    )
     
     mid_peaks_dt = df_daily.iloc[mid_peaks_idx].index
     mid_troughs_dt = df_daily.iloc[mid_troughs_idx].index
@@ -81,21 +79,23 @@ def main():
     print("=" * 50)
     
     # ATR过滤 + 峰谷检测
-    close_60 = h1_data['收盘']
-    atr = ta.volatility.average_true_range(
-        h1_data['最高'], h1_data['最低'], h1_data['收盘'], window=14
+    close_60 = h1_data['收盘'].values
+    atr = average_true_range(
+        h1_data['最高'].values, h1_data['最低'].values, close_60, window=14
     )
     
     # 过滤低波动区域
-    valid = atr > atr.mean() * 1.2
+    valid = atr > np.mean(atr) * 1.2
     valid_close = close_60[valid]
+    valid_index = h1_data.index[valid]
     
     # 检测微观极值点
-    micro_peaks_idx = find_peaks(valid_close.values, distance=6)[0]
-    micro_troughs_idx = find_peaks(-valid_close.values, distance=6)[0]
+    micro_peaks_idx, micro_troughs_idx = peaks_troughs_distance(
+        valid_close, distance=6, backend=BACKEND
+    )
     
-    micro_peaks_dt = valid_close.index[micro_peaks_idx]
-    micro_troughs_dt = valid_close.index[micro_troughs_idx]
+    micro_peaks_dt = valid_index[micro_peaks_idx]
+    micro_troughs_dt = valid_index[micro_troughs_idx]
     
     print(f"微观层检测结果:")
     print(f"  • 60分钟峰值: {len(micro_peaks_dt)} 个")
@@ -106,6 +106,9 @@ def main():
     print("生成可视化图表")
     print("=" * 50)
     
+    # matplotlib 导入较慢，到绘图阶段再加载
+    from peak_valley_detector.visualization.visualizer import MultiLayerVisualizer, create_summary_report
+    
     visualizer = MultiLayerVisualizer(figsize=(14, 8))
     
     # 绘制综合结果图
@@ -20,10 +20,30 @@ __version__ = "2.0.0"
 __author__ = "AI Assistant"
 __email__ = "assistant@ai.com"
 
-# 导入主要类和函数
-from .core.changepoint_detector import HybridChangePointDetector, ExtremaClassifier
-from .data.fetcher import StockDataFetcher
-from .visualization.visualizer import MultiLayerVisualizer, create_summary_report
+import importlib
+
+# 主要类和函数按需导入: 子模块依赖 akshare / matplotlib / ruptures，
+# 首次访问时才加载，仅导入包 (如读取 __version__) 时不付出这部分开销
+_LAZY_EXPORTS = {
+    'HybridChangePointDetector': '.core.changepoint_detector',
+    'ExtremaClassifier': '.core.changepoint_detector',
+    'StockDataFetcher': '.data.fetcher',
+    'MultiLayerVisualizer': '.visualization.visualizer',
+    'create_summary_report': '.visualization.visualizer',
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_EXPORTS))
 
 __all__ = [
     'HybridChangePointDetector',
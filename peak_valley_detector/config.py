@@ -1,11 +1,51 @@
 """配置管理模块"""
 
+import functools
 import os
 import yaml
 from typing import Dict, Optional, Any
 from pathlib import Path
 
 
+# 优先使用 libyaml 的 C 加速加载器
+_YamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+def _find_config_file(config_file: Optional[str] = None) -> Optional[str]:
+    """
+    查找配置文件
+    
+    不做缓存: 查找结果依赖当前目录与文件是否存在，
+    由 ``DataSourceConfig.config_file`` 在实例内缓存，``reload_config`` 时重新查找
+    """
+    if config_file and os.path.exists(config_file):
+        return config_file
+    
+    # 按优先级查找配置文件
+    possible_files = [
+        "data_sources_config.yaml",
+        "data_sources_config.yml", 
+        "config.yaml",
+        "config.yml",
+        "local_config.yaml",
+        "local_config.yml"
+    ]
+    
+    # 在当前目录和项目根目录查找
+    search_dirs = [
+        os.getcwd(),
+        Path(__file__).parent.parent,  # 项目根目录
+    ]
+    
+    for search_dir in search_dirs:
+        for filename in possible_files:
+            filepath = os.path.join(search_dir, filename)
+            if os.path.exists(filepath):
+                return filepath
+    
+    return None
+
+
 class DataSourceConfig:
     """数据源配置管理类"""
     
@@ -17,38 +57,20 @@ class DataSourceConfig:
         ----------
         config_file : Optional[str]
             配置文件路径，如果不指定则按优先级查找默认配置文件
+        
+        配置文件在首次读取配置时才查找和加载
         """
-        self.config_file = self._find_config_file(config_file)
-        self.config = self._load_config()
+        self._config_file_arg = config_file
     
-    def _find_config_file(self, config_file: Optional[str] = None) -> Optional[str]:
-        """查找配置文件"""
-        if config_file and os.path.exists(config_file):
-            return config_file
-        
-        # 按优先级查找配置文件
-        possible_files = [
-            "data_sources_config.yaml",
-            "data_sources_config.yml", 
-            "config.yaml",
-            "config.yml",
-            "local_config.yaml",
-            "local_config.yml"
-        ]
-        
-        # 在当前目录和项目根目录查找
-        search_dirs = [
-            os.getcwd(),
-            Path(__file__).parent.parent,  # 项目根目录
-        ]
-        
-        for search_dir in search_dirs:
-            for filename in possible_files:
-                filepath = os.path.join(search_dir, filename)
-                if os.path.exists(filepath):
-                    return filepath
-        
-        return None
+    @functools.cached_property
+    def config_file(self) -> Optional[str]:
+        """配置文件路径"""
+        return _find_config_file(self._config_file_arg)
+    
+    @functools.cached_property
+    def config(self) -> Dict[str, Any]:
+        """配置内容"""
+        return self._load_config()
     
     def _load_config(self) -> Dict[str, Any]:
         """加载配置文件"""
@@ -57,7 +79,7 @@ class DataSourceConfig:
         
         try:
             with open(self.config_file, 'r', encoding='utf-8') as f:
-                return yaml.safe_load(f) or {}
+                return yaml.load(f, Loader=_YamlLoader) or {}
         except Exception as e:
             print(f"警告：无法加载配置文件 {self.config_file}: {e}")
             return {}
@@ -75,6 +97,18 @@ class DataSourceConfig:
         tokens = self.config.get('tokens', {})
         return tokens.get(source)
     
+    def is_cache_enabled(self) -> bool:
+        """是否开启行情磁盘缓存"""
+        return bool(self.config.get('cache_enabled', False))
+    
+    def get_cache_ttl(self) -> float:
+        """磁盘缓存有效期（秒）"""
+        return float(self.config.get('cache_ttl', 86400))
+    
+    def get_cache_dir(self) -> str:
+        """磁盘缓存目录"""
+        return self.config.get('cache_dir', '.cache_data')
+    
     def get_all_tokens(self) -> Dict[str, str]:
         """获取所有token"""
         return self.config.get('tokens', {})
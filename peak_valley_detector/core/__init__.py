@@ -4,13 +4,19 @@
 包含Score-Driven BOCPD算法和变点检测器的实现
 """
 
-from .score_driven_bocpd import ScoreDrivenModel, BayesianOnlineChangePointDetection, rigorous_sd_bocpd
+from .score_driven_bocpd import (
+    ScoreDrivenModel, BayesianOnlineChangePointDetection, rigorous_sd_bocpd, stream_sd_bocpd
+)
 from .changepoint_detector import HybridChangePointDetector, ExtremaClassifier
+from .extrema import local_extrema, peaks_troughs_distance
 
 __all__ = [
     'ScoreDrivenModel',
     'BayesianOnlineChangePointDetection', 
     'rigorous_sd_bocpd',
+    'stream_sd_bocpd',
     'HybridChangePointDetector',
-    'ExtremaClassifier'
+    'ExtremaClassifier',
+    'local_extrema',
+    'peaks_troughs_distance'
 ]
@@ -0,0 +1,118 @@
+"""
+Score-Driven BOCPD 的 Numba 内核
+numba 不可用时 ``_sd_bocpd`` 为 None，由调用方回退到纯 Python 实现
+"""
+
+import math
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - optional
+    njit = None
+
+
+def _sd_bocpd_kernel(series, variance0, nu, omega, alpha, beta, hazard_rate,
+                     threshold, max_run_length):
+    """
+    单次遍历完成 GAS 方差更新与 BOCPD 递推
+
+    语义与 ``rigorous_sd_bocpd`` 的纯 Python 循环一致：学生 t 密度改为闭式表达式，
+    运行长度分布写入预分配缓冲区，不再逐步重新分配数组。
+
+    Args:
+        series: 时间序列数据 (长度至少为 2)
+        variance0: 初始方差，由调用方以 NumPy 计算 (numba 的 np.var 在常数窗口上
+            可能得到非零的舍入误差，改变变点结果)
+        nu: 学生 t 分布自由度
+        omega, alpha, beta: GAS 模型参数
+        hazard_rate: BOCPD 变点先验概率
+        threshold: 变点检测阈值
+        max_run_length: 运行长度分布的最大长度 (至少为 2)
+
+    Returns:
+        (changepoints, variances, scores): int64 变点索引及 float32 方差、得分序列
+    """
+    n = series.shape[0]
+    changepoints = np.empty(n, dtype=np.int64)
+    n_cps = 0
+    variances = np.zeros(n, dtype=np.float32)
+    scores = np.zeros(n, dtype=np.float32)
+
+    # 学生 t 密度的归一化常数只与 nu 有关
+    t_norm = math.exp(
+        math.lgamma((nu + 1.0) / 2.0) - math.lgamma(nu / 2.0)
+        - 0.5 * math.log(nu * math.pi)
+    )
+    t_power = -(nu + 1.0) / 2.0
+    growth = 1.0 - hazard_rate
+    long_run_variance = omega / (1.0 - beta)
+
+    # 运行长度分布 P(r_t)，有效长度为 rl_len
+    run_length_probs = np.empty(min(n, max_run_length) + 1)
+    run_length_probs[0] = 1.0
+    rl_len = 1
+
+    mu_t = np.float64(series[0])
+    variance_t = np.float64(variance0)
+
+    for t in range(1, n):
+        x_t = np.float64(series[t])
+
+        # 得分与 GAS 方差更新
+        sd = np.sqrt(variance_t)
+        standardized = (x_t - mu_t) / sd
+        score_t = (nu + 1.0) * standardized / (nu + standardized * standardized) * sd
+        scores[t] = score_t
+        variance_t = omega + alpha * score_t * score_t + beta * variance_t
+        variances[t] = variance_t
+
+        # 预测概率 (学生 t 分布)
+        standardized = (x_t - mu_t) / np.sqrt(variance_t)
+        predictive_prob = t_norm * (1.0 + standardized * standardized / nu) ** t_power
+
+        # 截断: 最长运行长度的概率并入前一位
+        if rl_len >= max_run_length:
+            run_length_probs[rl_len - 2] += run_length_probs[rl_len - 1]
+            rl_len -= 1
+
+        # BOCPD 更新: 变点概率写入 0 号位，其余右移一位
+        changepoint_prob = 0.0
+        for i in range(rl_len):
+            changepoint_prob += run_length_probs[i]
+        changepoint_prob *= hazard_rate
+        for i in range(rl_len, 0, -1):
+            run_length_probs[i] = run_length_probs[i - 1] * growth
+        run_length_probs[0] = changepoint_prob
+        rl_len += 1
+
+        # 似然对所有运行长度相同，归一化后抵消，只需判断加权和是否为正
+        total_prob = 0.0
+        for i in range(rl_len):
+            total_prob += run_length_probs[i]
+        if total_prob * predictive_prob > 0:
+            for i in range(rl_len):
+                run_length_probs[i] /= total_prob
+        else:
+            for i in range(rl_len):
+                run_length_probs[i] = 1.0 / rl_len
+
+        if run_length_probs[0] > threshold:
+            changepoints[n_cps] = t
+            n_cps += 1
+            # 重置参数
+            mu_t = x_t
+            variance_t = long_run_variance
+            run_length_probs[0] = 1.0
+            rl_len = 1
+        else:
+            mu_t = 0.95 * mu_t + 0.05 * x_t
+
+    return changepoints[:n_cps], variances, scores
+
+
+if njit is not None:
+    # error_model='numpy': 除零得到 inf / nan 而非抛异常，与纯 Python 版本的 NumPy 标量行为一致
+    _sd_bocpd = njit(cache=True, nogil=True, error_model='numpy')(_sd_bocpd_kernel)
+else:  # pragma: no cover - optional
+    _sd_bocpd = None
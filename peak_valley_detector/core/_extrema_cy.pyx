@@ -0,0 +1,76 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+极值分类内核的 Cython 预编译版本
+语义与 ``_extrema_numba._classify_kernel`` 一致，安装时编译，运行时无需 JIT 预热
+"""
+
+import numpy as np
+cimport numpy as cnp
+
+cnp.import_array()
+
+cdef enum:
+    PEAK = 1
+    TROUGH = -1
+
+
+def classify(const double[::1] values, const cnp.int64_t[::1] cps,
+             Py_ssize_t window, bint check_right):
+    """
+    对所有变点逐一分类
+
+    Args:
+        values: float64 价格序列
+        cps: int64 变点索引数组
+        window: 检查窗口大小
+        check_right: 是否检查右侧窗口
+
+    Returns:
+        与 cps 等长的 int8 标签数组 (PEAK / TROUGH / NONE)
+    """
+    cdef Py_ssize_t n = values.shape[0]
+    cdef Py_ssize_t m = cps.shape[0]
+    labels_arr = np.zeros(m, dtype=np.int8)
+    cdef cnp.int8_t[::1] labels = labels_arr
+    cdef Py_ssize_t i, j, idx
+    cdef double current, v, left_max, left_min, right_max, right_min
+
+    if window <= 0:
+        return labels_arr
+
+    with nogil:
+        for i in range(m):
+            idx = cps[i]
+            if idx < window or idx >= n or (check_right and idx >= n - window):
+                continue
+
+            current = values[idx]
+            left_max = values[idx - window]
+            left_min = left_max
+            for j in range(idx - window + 1, idx):
+                v = values[j]
+                if v > left_max:
+                    left_max = v
+                if v < left_min:
+                    left_min = v
+
+            if check_right:
+                right_max = values[idx + 1]
+                right_min = right_max
+                for j in range(idx + 2, idx + window + 1):
+                    v = values[j]
+                    if v > right_max:
+                        right_max = v
+                    if v < right_min:
+                        right_min = v
+                if current > left_max and current > right_max:
+                    labels[i] = PEAK
+                elif current < left_min and current < right_min:
+                    labels[i] = TROUGH
+            else:
+                if current > left_max:
+                    labels[i] = PEAK
+                elif current < left_min:
+                    labels[i] = TROUGH
+
+    return labels_arr
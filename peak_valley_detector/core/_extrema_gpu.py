@@ -0,0 +1,81 @@
+"""
+极值检测的 GPU 后端 (CuPy + cuSignal)
+cupy 在首次走 GPU 路径时才导入；不可用时 ``GPU_AVAILABLE`` 为 False，由调用方回退到 CPU 实现
+"""
+
+import functools
+import importlib.util
+import numpy as np
+from typing import Tuple
+
+
+@functools.lru_cache(maxsize=None)
+def _gpu_modules():
+    """导入 (cupy, cusignal)，不可用时返回 None；结果缓存，只尝试一次"""
+    # 未安装时直接返回，不付出导入尝试的开销
+    if importlib.util.find_spec("cupy") is None:
+        return None
+    try:
+        import cupy as cp
+        try:
+            from cupyx.scipy import signal as cusignal
+        except ImportError:
+            import cusignal
+    except Exception:  # pragma: no cover - optional
+        return None
+    return cp, cusignal
+
+
+def __getattr__(name):
+    # GPU_AVAILABLE 按需求值，导入本模块时不加载 cupy / CUDA 运行时
+    if name == 'GPU_AVAILABLE':
+        return _gpu_modules() is not None
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# auto 模式下启用 GPU 的最小序列长度，更短的序列主机-显存拷贝开销大于收益
+GPU_MIN_SIZE = 100_000
+
+BACKENDS = ('auto', 'cpu', 'cuda')
+
+
+def use_gpu(size: int, backend: str = 'auto') -> bool:
+    """
+    判断是否走 GPU 路径
+
+    Args:
+        size: 序列长度
+        backend: 'auto'、'cpu' 或 'cuda'
+
+    Returns:
+        是否使用 GPU
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unsupported backend: {backend}")
+    if backend == 'cuda':
+        if _gpu_modules() is None:
+            raise ImportError("cuda 后端不可用，请先安装 cupy 与 cusignal")
+        return True
+    if backend == 'auto':
+        # 短序列不走 GPU，也就无需导入 cupy
+        return size >= GPU_MIN_SIZE and _gpu_modules() is not None
+    return False
+
+
+def local_extrema(arr: np.ndarray, order: int) -> Tuple[np.ndarray, np.ndarray]:
+    """在 GPU 上执行 argrelextrema，返回 (peaks_idx, troughs_idx)"""
+    cp, cusignal = _gpu_modules()
+    x = cp.asarray(arr)
+    peaks = cusignal.argrelextrema(x, cp.greater, order=order)[0]
+    troughs = cusignal.argrelextrema(x, cp.less, order=order)[0]
+    return cp.asnumpy(peaks), cp.asnumpy(troughs)
+
+
+def peaks_troughs_distance(x: np.ndarray,
+                           distance: int) -> Tuple[np.ndarray, np.ndarray]:
+    """在 GPU 上执行 find_peaks(distance=...)，返回 (peaks_idx, troughs_idx)"""
+    cp, cusignal = _gpu_modules()
+    xd = cp.asarray(x)
+    peaks = cusignal.find_peaks(xd, distance=distance)[0]
+    troughs = cusignal.find_peaks(-xd, distance=distance)[0]
+    return cp.asnumpy(peaks), cp.asnumpy(troughs)
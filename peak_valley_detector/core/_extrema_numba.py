@@ -0,0 +1,154 @@
+"""
+极值检测的 Numba 内核
+``_classify`` 依次选用预编译的 Cython 扩展、numba 内核和 NumPy 向量化实现；
+numba 不可用时 ``_suppress_by_distance`` 为 None，由调用方回退到 SciPy 实现
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - optional
+    njit = None
+
+try:
+    from ._extrema_cy import classify as _classify_cy
+except ImportError:  # pragma: no cover - optional
+    _classify_cy = None
+
+# 分类标签
+NONE = 0
+PEAK = 1
+TROUGH = -1
+
+
+def _classify_kernel(values, cps, window, check_right):
+    """
+    对所有变点逐一分类，语义与 ``ExtremaClassifier.classify_extrema`` 一致
+
+    Args:
+        values: float64 价格序列
+        cps: int64 变点索引数组
+        window: 检查窗口大小
+        check_right: 是否检查右侧窗口
+
+    Returns:
+        与 cps 等长的 int8 标签数组 (PEAK / TROUGH / NONE)
+    """
+    n = values.shape[0]
+    labels = np.zeros(cps.shape[0], dtype=np.int8)
+    if window <= 0:
+        return labels
+
+    for i in range(cps.shape[0]):
+        idx = cps[i]
+        if idx < window or idx >= n or (check_right and idx >= n - window):
+            continue
+
+        current = values[idx]
+        left_max = values[idx - window]
+        left_min = left_max
+        for j in range(idx - window + 1, idx):
+            v = values[j]
+            if v > left_max:
+                left_max = v
+            if v < left_min:
+                left_min = v
+
+        if check_right:
+            right_max = values[idx + 1]
+            right_min = right_max
+            for j in range(idx + 2, idx + window + 1):
+                v = values[j]
+                if v > right_max:
+                    right_max = v
+                if v < right_min:
+                    right_min = v
+            if current > left_max and current > right_max:
+                labels[i] = PEAK
+            elif current < left_min and current < right_min:
+                labels[i] = TROUGH
+        else:
+            if current > left_max:
+                labels[i] = PEAK
+            elif current < left_min:
+                labels[i] = TROUGH
+
+    return labels
+
+
+def _classify_numpy(values, cps, window, check_right):
+    """
+    ``_classify_kernel`` 的 NumPy 版本
+
+    只为有效变点取出左右窗口视图，一次归约得到全部最大/最小值，
+    每个变点的判断退化为标量比较。
+    """
+    n = values.shape[0]
+    labels = np.zeros(cps.shape[0], dtype=np.int8)
+    if window <= 0:
+        return labels
+
+    valid = (cps >= window) & (cps < n)
+    if check_right:
+        valid &= cps < n - window
+    idx = cps[valid]
+    if idx.size == 0:
+        return labels
+
+    windows = sliding_window_view(values, window)
+    left = windows[idx - window]
+    current = values[idx]
+    is_peak = current > left.max(axis=1)
+    is_trough = current < left.min(axis=1)
+    if check_right:
+        right = windows[idx + 1]
+        is_peak &= current > right.max(axis=1)
+        is_trough &= current < right.min(axis=1)
+
+    labels[valid] = np.where(is_peak, PEAK, np.where(is_trough, TROUGH, NONE))
+    return labels
+
+
+def _suppress_by_distance_kernel(positions, order, distance):
+    """
+    按优先级从高到低贪心保留极值点，剔除其 distance 范围内的其他点
+
+    与 ``scipy.signal.find_peaks`` 的 distance 过滤规则一致。
+
+    Args:
+        positions: 升序排列的候选点位置
+        order: 候选点按优先级升序的排列 (``np.argsort(priority)``)
+        distance: 最小间距
+
+    Returns:
+        与 positions 等长的保留掩码
+    """
+    n = positions.shape[0]
+    keep = np.ones(n, dtype=np.bool_)
+    for i in range(n - 1, -1, -1):
+        j = order[i]
+        if not keep[j]:
+            continue
+        k = j - 1
+        while k >= 0 and positions[j] - positions[k] < distance:
+            keep[k] = False
+            k -= 1
+        k = j + 1
+        while k < n and positions[k] - positions[j] < distance:
+            keep[k] = False
+            k += 1
+    return keep
+
+
+if njit is not None:
+    _classify = njit(cache=True, nogil=True)(_classify_kernel)
+    _suppress_by_distance = njit(cache=True, nogil=True)(_suppress_by_distance_kernel)
+else:  # pragma: no cover - optional
+    _classify = _classify_numpy
+    _suppress_by_distance = None
+
+# 预编译扩展无需 JIT 预热，对只运行一次的命令行场景优先使用
+if _classify_cy is not None:  # pragma: no cover - optional
+    _classify = _classify_cy
@@ -3,11 +3,159 @@
 集成多种变点检测算法，提供统一接口
 """
 
+import datetime
+import functools
+import os
 import numpy as np
 import pandas as pd
 import ruptures as rpt
-from typing import List, Optional
-from .score_driven_bocpd import rigorous_sd_bocpd
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import List, Optional, Tuple
+from .. import __version__
+from ..config import get_global_config
+from .score_driven_bocpd import rigorous_sd_bocpd, R_MAX
+from ._extrema_numba import _classify, PEAK, TROUGH, NONE
+
+try:
+    from joblib import Memory
+except ImportError:  # pragma: no cover - optional
+    Memory = None
+
+
+@functools.lru_cache(maxsize=4)
+def _open_memory(location: str, ttl: float) -> "Memory":
+    """打开缓存目录，并清理超过有效期的条目"""
+    memory = Memory(location=location, verbose=0)
+    memory.reduce_size(age_limit=datetime.timedelta(seconds=ttl))
+    return memory
+
+
+def _cached(func):
+    """
+    配置文件开启 cache_enabled 且 joblib 可用时缓存函数结果，否则直接调用
+
+    缓存位于 ``cache_dir`` 下按包版本与 ruptures 版本区分的子目录，
+    算法实现升级后不会读到旧结果；超过 ``cache_ttl`` 的条目在打开时清理。
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        config = get_global_config()
+        if Memory is None or not config.is_cache_enabled():
+            return func(*args, **kwargs)
+        location = os.path.join(
+            config.get_cache_dir(), 'changepoints', f'{__version__}-ruptures{rpt.__version__}'
+        )
+        memory = _open_memory(location, config.get_cache_ttl())
+        return memory.cache(func)(*args, **kwargs)
+    return wrapper
+
+
+class CostL2Cumsum(rpt.base.BaseCost):
+    """
+    基于前缀和的 L2 代价
+
+    与 ruptures 内置的 ``CostL2`` 结果一致，但 fit 时预先计算 Σx 与 Σx² 的前缀和，
+    每次 ``error(start, end)`` 只需常数次标量运算，不再对片段求方差。
+    前缀和以 float64 累加，避免 float32 输入的精度损失。
+    """
+
+    model = "l2_cumsum"
+
+    def __init__(self):
+        self.signal = None
+        self.min_size = 1
+        self.cx = None
+        self.cx2 = None
+
+    def fit(self, signal) -> "CostL2Cumsum":
+        """
+        预计算前缀和
+
+        Args:
+            signal: 形状为 (n_samples,) 或 (n_samples, n_features) 的数组
+
+        Returns:
+            self
+        """
+        self.signal = signal.reshape(-1, 1) if signal.ndim == 1 else signal
+        n, d = self.signal.shape
+        cx = np.zeros((n + 1, d))
+        cx2 = np.zeros((n + 1, d))
+        np.cumsum(self.signal, axis=0, dtype=np.float64, out=cx[1:])
+        np.cumsum(np.square(self.signal, dtype=np.float64), axis=0, out=cx2[1:])
+        # 单变量时转为 Python 列表，error 中按下标取 float 比 ndarray 标量运算更快
+        if d == 1:
+            cx, cx2 = cx.ravel().tolist(), cx2.ravel().tolist()
+        self.cx, self.cx2 = cx, cx2
+        return self
+
+    def error(self, start, end) -> float:
+        """
+        片段 [start:end] 的平方误差和: Σx² - (Σx)²/k
+
+        Args:
+            start: 片段起点
+            end: 片段终点
+
+        Returns:
+            片段代价
+        """
+        if end - start < self.min_size:
+            raise rpt.exceptions.NotEnoughPoints
+        sx = self.cx[end] - self.cx[start]
+        sx2 = self.cx2[end] - self.cx2[start]
+        if isinstance(self.cx, list):
+            return sx2 - sx * sx / (end - start)
+        return float((sx2 - sx * sx / (end - start)).sum())
+
+
+def _as_column(series: np.ndarray, scale: bool = False) -> np.ndarray:
+    """
+    转换为 ruptures 拟合用的 C 连续 float32 列向量
+
+    中心化结果直接写入 float32 缓冲区，无论输入是否连续都只分配一次。
+
+    Args:
+        series: 一维序列
+        scale: 是否同时除以标准差
+
+    Returns:
+        形状为 (n, 1) 的 float32 数组
+    """
+    series = np.asarray(series)
+    x = np.empty(len(series), dtype=np.float32)
+    np.subtract(series, series.mean(), out=x, casting='unsafe')
+    if scale:
+        std = x.std(dtype=np.float64)
+        if std > 0:
+            x /= std
+    return x[:, None]
+
+
+@_cached
+def _fit_dynp(x2d: np.ndarray, n_bkps: int, min_size: int) -> List[int]:
+    """Dynp 拟合，返回 ruptures 原始断点"""
+    algo_dynp = rpt.Dynp(custom_cost=CostL2Cumsum(), min_size=min_size, jump=1)
+    return algo_dynp.fit_predict(x2d, n_bkps=n_bkps)
+
+
+@_cached
+def _fit_bottom_up(x2d: np.ndarray, pen: float, min_size: int) -> List[int]:
+    """BottomUp 拟合，返回 ruptures 原始断点"""
+    algo_bottom_up = rpt.BottomUp(custom_cost=CostL2Cumsum(), min_size=min_size)
+    return algo_bottom_up.fit_predict(x2d, pen=pen)
+
+
+@_cached
+def _fit_sd_bocpd(series: np.ndarray, nu: float, omega: float, alpha: float,
+                  beta: float, hazard_rate: float, threshold: float,
+                  max_run_length: int) -> List[int]:
+    """SD-BOCPD 检测，仅返回变点索引 (参数全部显式给出，均计入缓存键)"""
+    changepoints, _, _ = rigorous_sd_bocpd(
+        series, nu=nu, omega=omega, alpha=alpha, beta=beta,
+        hazard_rate=hazard_rate, threshold=threshold, max_run_length=max_run_length,
+    )
+    return changepoints
 
 
 class HybridChangePointDetector:
@@ -18,7 +166,7 @@ class HybridChangePointDetector:
         pass
     
     def detect_ruptures_dynp(self, series: np.ndarray, n_bkps: int = 15, 
-                           min_size: int = 8) -> List[int]:
+                           min_size: int = 8) -> np.ndarray:
         """
         使用 Ruptures 的 Dynp (Dynamic Programming) 算法
         
@@ -28,18 +176,20 @@ class HybridChangePointDetector:
             min_size: 最小段长度
             
         Returns:
-            变点索引列表
+            变点索引数组
         """
         try:
-            algo_dynp = rpt.Dynp(model="l2", min_size=min_size, jump=1)
-            cp_dynp = algo_dynp.fit_predict(series.reshape(-1, 1), n_bkps=n_bkps)
-            return [cp - 1 for cp in cp_dynp[:-1]]  # 调整索引
+            # 固定变点数时 l2 分段对仿射变换不变，标准化后以 float32 拟合，
+            # 数据量减半且不受价格量级影响
+            x2d = _as_column(series, scale=True)
+            cp_dynp = _fit_dynp(x2d, n_bkps=n_bkps, min_size=min_size)
+            return np.asarray(cp_dynp[:-1], dtype=np.int64) - 1  # 调整索引
         except Exception as e:
             print(f"Dynp 算法失败: {e}")
-            return []
+            return np.array([], dtype=np.int64)
     
     def detect_ruptures_bottom_up(self, series: np.ndarray, 
-                                 pen: float = 0.5, min_size: int = 6) -> List[int]:
+                                 pen: float = 0.5, min_size: int = 6) -> np.ndarray:
         """
         使用 Ruptures 的 BottomUp 算法
         
@@ -49,15 +199,16 @@ class HybridChangePointDetector:
             min_size: 最小段长度
             
         Returns:
-            变点索引列表
+            变点索引数组
         """
         try:
-            algo_bottom_up = rpt.BottomUp(model="l2", min_size=min_size)
-            cp_returns = algo_bottom_up.fit_predict(series.reshape(-1, 1), pen=pen)
-            return [cp for cp in cp_returns[:-1]]
+            # 惩罚项与代价同量级，只能平移不能缩放，因此仅中心化
+            x2d = _as_column(series)
+            cp_returns = _fit_bottom_up(x2d, pen=pen, min_size=min_size)
+            return np.asarray(cp_returns[:-1], dtype=np.int64)
         except Exception as e:
             print(f"BottomUp 算法失败: {e}")
-            return []
+            return np.array([], dtype=np.int64)
     
     def detect_sd_bocpd(self, series: np.ndarray, 
                        nu: float = 4.0, omega: float = 0.001,
@@ -78,14 +229,16 @@ class HybridChangePointDetector:
         Returns:
             变点索引列表
         """
-        changepoints, _, _ = rigorous_sd_bocpd(
+        # 保持 float64: 降为 float32 会改变初始方差，进而改变检测到的变点
+        series = np.ascontiguousarray(series, dtype=np.float64)
+        return _fit_sd_bocpd(
             series, nu=nu, omega=omega, alpha=alpha, beta=beta,
-            hazard_rate=hazard_rate, threshold=threshold
+            hazard_rate=hazard_rate, threshold=threshold, max_run_length=R_MAX
         )
-        return changepoints
     
     def detect_volatility_based(self, series: np.ndarray, 
-                               window: int = 8, percentile: int = 85) -> List[int]:
+                               window: int = 8, percentile: int = 85,
+                               log_r: Optional[np.ndarray] = None) -> List[int]:
         """
         基于波动率的简单变点检测
         
@@ -93,17 +246,32 @@ class HybridChangePointDetector:
             series: 时间序列数据
             window: 滚动窗口大小
             percentile: 阈值百分位数
+            log_r: 预先计算的对数收益率，提供时不再重复计算
             
         Returns:
             变点索引列表
         """
-        returns = np.diff(np.log(series))
-        volatility = pd.Series(returns).rolling(window).std()
-        vol_changes = np.abs(np.diff(volatility.fillna(0)))
+        if log_r is None:
+            # 先转为 ndarray，pd.Series 输入也按位置差分
+            returns = np.diff(np.log(np.asarray(series, dtype=np.float64)))
+        else:
+            returns = log_r
+        
+        # 滚动标准差 (ddof=1)，前 window-1 个位置及 NaN 视为 0
+        volatility = np.zeros(len(returns))
+        if len(returns) >= window:
+            volatility[window - 1:] = sliding_window_view(returns, window).std(
+                axis=1, ddof=1
+            )
+        volatility[np.isnan(volatility)] = 0
+        
+        # 波动率变化的绝对值
+        vol_changes = np.abs(np.diff(volatility))
+        
         vol_threshold = np.percentile(vol_changes, percentile)
-        return list(np.where(vol_changes > vol_threshold)[0] + 1)
+        return list(np.flatnonzero(vol_changes > vol_threshold) + 1)
     
-    def detect_comprehensive(self, series: np.ndarray) -> List[int]:
+    def detect_comprehensive(self, series: np.ndarray) -> np.ndarray:
         """
         综合变点检测方法，使用多种算法并优选结果
         
@@ -111,43 +279,47 @@ class HybridChangePointDetector:
             series: 时间序列数据
             
         Returns:
-            最终的变点索引列表
+            最终的变点索引数组 (int64)，无论采用哪种方法的结果
         """
         print("正在进行严谨的 Score-Driven BOCPD 变点检测...")
         
+        # 按优先级依次尝试: Dynp > 收益率 BottomUp > SD-BOCPD > 波动率，
+        # 前一方法有结果时直接返回，不再运行后续方法。
+        # 不并行运行三种算法: 序列长度足够时 Dynp 总能给出 n_bkps 个变点，
+        # 不足时在参数检查阶段即快速失败，因此顺序回退的耗时接近单次 Dynp，
+        # 而并行方案每次都要付出三种算法的计算量
+        
         # 方法1: Ruptures Dynp 算法
         print("使用 Ruptures Dynp 算法...")
-        cp_dynp = self.detect_ruptures_dynp(series)
-        print(f"Dynp 检测到 {len(cp_dynp)} 个变点")
-        
-        # 方法2: 保守的 SD-BOCPD
-        print("使用保守的 SD-BOCPD...")
-        cp_sdbocpd = self.detect_sd_bocpd(series)
-        print(f"SD-BOCPD 检测到 {len(cp_sdbocpd)} 个变点")
+        cp_indices = self.detect_ruptures_dynp(series)
+        print(f"Dynp 检测到 {len(cp_indices)} 个变点")
+        if len(cp_indices) > 0:
+            print(f"采用 Dynp 结果: {len(cp_indices)} 个变点")
+            return np.asarray(cp_indices, dtype=np.int64)
         
-        # 方法3: 基于收益率的统计变点检测
+        # 方法2: 基于收益率的统计变点检测
         print("使用收益率统计方法...")
-        returns = np.diff(np.log(series))
-        cp_returns = self.detect_ruptures_bottom_up(returns)
-        print(f"收益率方法检测到 {len(cp_returns)} 个变点")
-        
-        # 综合多种方法的结果，优先考虑专业库的结果
-        if len(cp_dynp) > 0:
-            cp_indices = cp_dynp
-            print(f"采用 Dynp 结果: {len(cp_indices)} 个变点")
-        elif len(cp_returns) > 0:
-            cp_indices = cp_returns
+        log_r = np.diff(np.log(series))
+        cp_indices = self.detect_ruptures_bottom_up(log_r)
+        print(f"收益率方法检测到 {len(cp_indices)} 个变点")
+        if len(cp_indices) > 0:
             print(f"采用收益率方法结果: {len(cp_indices)} 个变点")
-        elif len(cp_sdbocpd) > 0:
-            cp_indices = cp_sdbocpd
+            return np.asarray(cp_indices, dtype=np.int64)
+        
+        # 方法3: 保守的 SD-BOCPD
+        print("使用保守的 SD-BOCPD...")
+        cp_indices = self.detect_sd_bocpd(series)
+        print(f"SD-BOCPD 检测到 {len(cp_indices)} 个变点")
+        if len(cp_indices) > 0:
             print(f"采用 SD-BOCPD 结果: {len(cp_indices)} 个变点")
-        else:
-            # 最后的回退方案：简单的波动率方法
-            print("所有方法失效，使用简单波动率检测...")
-            cp_indices = self.detect_volatility_based(series)
-            print(f"波动率方法检测到 {len(cp_indices)} 个变点")
+            return np.asarray(cp_indices, dtype=np.int64)
+        
+        # 最后的回退方案：简单的波动率方法
+        print("所有方法失效，使用简单波动率检测...")
+        cp_indices = self.detect_volatility_based(series, log_r=log_r)
+        print(f"波动率方法检测到 {len(cp_indices)} 个变点")
         
-        return cp_indices
+        return np.asarray(cp_indices, dtype=np.int64)
 
 
 class ExtremaClassifier:
@@ -204,6 +376,29 @@ class ExtremaClassifier:
         
         return None
     
+    @staticmethod
+    def classify_many(series: np.ndarray, indices, window: int = 3,
+                      check_right: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        批量极值点分类，逐点语义与 ``classify_extrema`` 一致
+        
+        所有索引在一次内核调用中完成判断，代替逐点调用 ``classify_extrema`` 的 Python 循环。
+        
+        Args:
+            series: 时间序列数据
+            indices: 待分类的索引数组
+            window: 检查窗口大小
+            check_right: 是否检查右侧窗口，False 可更早确认极值
+            
+        Returns:
+            (is_peak, is_trough): 与 indices 等长的布尔掩码
+        """
+        labels = _classify(
+            np.ascontiguousarray(series, dtype=np.float64),
+            np.ascontiguousarray(indices, dtype=np.int64), window, check_right
+        )
+        return labels == PEAK, labels == TROUGH
+    
     @staticmethod
     def classify_changepoints(
         series: pd.Series,
@@ -221,21 +416,27 @@ class ExtremaClassifier:
             check_right: 是否检查右侧窗口，False 表示仅检查左侧
             
         Returns:
-            (peaks_dates, troughs_dates): 峰值和谷值的日期列表
+            (peaks_dates, troughs_dates): 峰值和谷值的日期数组
         """
-        peaks_dt, troughs_dt = [], []
+        # 一次性取出底层数组，循环内不再经过 pandas 索引器
+        values = np.asarray(series.values)
+        idx_arr = series.index.to_numpy()
+        cps = np.asarray(changepoints, dtype=np.int64)
         
-        for idx in changepoints:
-            extrema_type = ExtremaClassifier.classify_extrema(
-                series.values, idx, window=window, check_right=check_right
-            )
-            
-            if extrema_type == 'peak':
-                peaks_dt.append(series.index[idx])
-                print(f"检测到 Peak: {series.index[idx]} (价格: {series.iloc[idx]:.2f})")
-            elif extrema_type == 'trough':
-                troughs_dt.append(series.index[idx])
-                print(f"检测到 Trough: {series.index[idx]} (价格: {series.iloc[idx]:.2f})")
-        
-        print(f"最终识别: {len(peaks_dt)} 个 Peaks, {len(troughs_dt)} 个 Troughs")
+        labels = _classify(
+            np.ascontiguousarray(values, dtype=np.float64), cps, window, check_right
+        )
+        
+        peaks_dt = idx_arr[cps[labels == PEAK]]
+        troughs_dt = idx_arr[cps[labels == TROUGH]]
+        
+        # 分类完成后拼接日志，只调用一次 print
+        names = {PEAK: 'Peak', TROUGH: 'Trough'}
+        log_lines = [
+            f"检测到 {names[label]}: {pd.Timestamp(idx_arr[idx])} (价格: {values[idx]:.2f})"
+            for idx, label in zip(cps, labels)
+            if label != NONE
+        ]
+        log_lines.append(f"最终识别: {len(peaks_dt)} 个 Peaks, {len(troughs_dt)} 个 Troughs")
+        print("\n".join(log_lines))
         return peaks_dt, troughs_dt
@@ -0,0 +1,104 @@
+"""
+局部极值检测模块
+提供中观层 / 微观层使用的向量化峰谷检测函数
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import find_peaks
+from typing import Tuple
+from . import _extrema_gpu
+from ._extrema_numba import _suppress_by_distance
+
+
+def local_extrema(arr: np.ndarray, order: int,
+                  backend: str = 'auto') -> Tuple[np.ndarray, np.ndarray]:
+    """
+    一次遍历同时检测局部峰值和谷值
+
+    语义与 ``argrelextrema(arr, np.greater/np.less, order=order)`` 一致
+    (严格不等式，边界按 ``mode='clip'`` 处理)，但只构建一次滑动窗口视图，
+    用左右半窗的最大/最小值归约代替 ``order`` 次移位比较。
+    NaN 处理同 argrelextrema: 与 NaN 的比较均为 False，NaN 本身及
+    ``order`` 范围内含 NaN 的点都不是极值。
+
+    Args:
+        arr: 一维价格序列
+        order: 每侧参与比较的点数
+        backend: 'cpu'、'cuda' 或 'auto' (大序列且 GPU 可用时使用 cuSignal)
+
+    Returns:
+        (peaks_idx, troughs_idx): 峰值和谷值的索引数组
+    """
+    arr = np.asarray(arr)
+    if order < 1:
+        raise ValueError("order must be an integer >= 1")
+    if _extrema_gpu.use_gpu(arr.size, backend):
+        return _extrema_gpu.local_extrema(arr, order)
+    if arr.size == 0:
+        empty = np.array([], dtype=np.intp)
+        return empty, empty
+
+    # 边界复制填充，等价于 argrelextrema 的 clip 模式
+    padded = np.pad(arr, order, mode='edge')
+    windows = sliding_window_view(padded, 2 * order + 1)
+    left = windows[:, :order]
+    right = windows[:, order + 1:]
+
+    peaks = np.flatnonzero(
+        (arr > left.max(axis=1)) & (arr > right.max(axis=1))
+    )
+    troughs = np.flatnonzero(
+        (arr < left.min(axis=1)) & (arr < right.min(axis=1))
+    )
+    return peaks, troughs
+
+
+def peaks_troughs_distance(x: np.ndarray, distance: int,
+                           backend: str = 'auto') -> Tuple[np.ndarray, np.ndarray]:
+    """
+    检测满足最小间距约束的峰值和谷值
+
+    等价于 ``find_peaks(x, distance=distance)`` 与
+    ``find_peaks(-x, distance=distance)``，但只做一次差分遍历，
+    也不需要构造取负后的数组。NaN 处理同 find_peaks: NaN 本身及
+    仅经 NaN 才回落 (回升) 的点都不是峰 (谷)。
+
+    Args:
+        x: 一维价格序列
+        distance: 相邻峰 (谷) 之间的最小间距
+        backend: 'cpu'、'cuda' 或 'auto'
+
+    Returns:
+        (peaks_idx, troughs_idx): 峰值和谷值的索引数组
+    """
+    x = np.asarray(x, dtype=np.float64)
+    if distance < 1:
+        raise ValueError("distance must be >= 1")
+    if _extrema_gpu.use_gpu(x.size, backend):
+        return _extrema_gpu.peaks_troughs_distance(x, distance)
+    if _suppress_by_distance is None:
+        # 没有 numba 时贪心筛选只能逐点解释执行，直接使用 SciPy 的 C 实现
+        return find_peaks(x, distance=distance)[0], find_peaks(-x, distance=distance)[0]
+
+    # 一次差分同时定位峰和谷: 跳过平台 (差分为 0)，
+    # 斜率由升转降为峰，由降转升为谷，平台取中点。
+    # 与 NaN 相邻的差分既非上升也非下降，两侧不构成转折，与 find_peaks 一致
+    dx = np.diff(x)
+    slope_idx = np.flatnonzero(dx)
+    rising = dx[slope_idx] > 0
+    falling = dx[slope_idx] < 0
+    turns = np.flatnonzero((rising[:-1] & falling[1:]) | (falling[:-1] & rising[1:]))
+    candidates = (slope_idx[turns] + 1 + slope_idx[turns + 1]) // 2
+    is_peak = rising[turns]
+
+    peaks = candidates[is_peak]
+    troughs = candidates[~is_peak]
+    distance = int(np.ceil(distance))
+    if distance > 1:
+        # 优先级与 find_peaks 相同: 峰按高度，谷按深度
+        peaks = peaks[_suppress_by_distance(peaks, np.argsort(x[peaks]), distance)]
+        troughs = troughs[
+            _suppress_by_distance(troughs, np.argsort(-x[troughs]), distance)
+        ]
+    return peaks, troughs
@@ -3,9 +3,15 @@ Score-Driven BOCPD 算法模块
 实现严谨的 GAS 模型和贝叶斯在线变点检测
 """
 
+import math
+import itertools
 import numpy as np
-from scipy import stats
-from typing import List, Tuple
+from typing import Iterable, Iterator, List, Tuple
+from ._bocpd_numba import _sd_bocpd
+
+# 运行长度分布的最大长度: 尾部概率按 (1-hazard_rate)^r 几何衰减，
+# 截断后每步代价为常数，整体复杂度由 O(n²) 降为 O(n·R_MAX)
+R_MAX = 200
 
 
 class ScoreDrivenModel:
@@ -13,6 +19,9 @@ class ScoreDrivenModel:
     基于学生 t 分布的 Score-Driven 动态参数更新
     """
     
+    # 固定属性集合，属性读取不经过实例 __dict__
+    __slots__ = ('nu', 'omega', 'alpha', 'beta')
+    
     def __init__(self, nu: float = 5.0, omega: float = 0.01, 
                  alpha: float = 0.05, beta: float = 0.9):
         """
@@ -43,18 +52,36 @@ class ScoreDrivenModel:
 class BayesianOnlineChangePointDetection:
     """贝叶斯在线变点检测 (BOCPD) 算法实现"""
     
-    def __init__(self, hazard_rate: float = 1/100, threshold: float = 0.7):
+    def __init__(self, hazard_rate: float = 1/100, threshold: float = 0.7,
+                 max_len: int = 256, max_run_length: int = R_MAX):
         """
         初始化 BOCPD 算法
         
         Args:
             hazard_rate: 变点先验概率 (1/期望运行长度)
             threshold: 变点检测阈值
+            max_len: 运行长度缓冲区的初始容量，不足时自动翻倍
+            max_run_length: 运行长度分布的最大长度，超出部分并入尾部
         """
+        if max_run_length < 2:
+            raise ValueError("max_run_length must be >= 2")
         self.hazard_rate = hazard_rate
         self.threshold = threshold
-        self.run_length_probs = np.array([1.0])  # P(r_t)
+        self.max_run_length = max_run_length
         self.changepoints = []
+        # P(r_t) 保存在预分配缓冲区的前 rl_len 个位置，update 中原地更新
+        self._buf = np.empty(max(int(max_len), 1) + 1)
+        self.reset()
+    
+    @property
+    def run_length_probs(self) -> np.ndarray:
+        """当前运行长度分布 P(r_t) (缓冲区视图)"""
+        return self._buf[:self.rl_len]
+    
+    def reset(self):
+        """重置运行长度分布，复用已分配的缓冲区"""
+        self._buf[0] = 1.0
+        self.rl_len = 1
         
     def update(self, predictive_prob: float) -> bool:
         """
@@ -66,36 +93,106 @@ class BayesianOnlineChangePointDetection:
         Returns:
             bool: 是否检测到变点
         """
-        # 预测分布: P(r_t | x_1:t-1)
-        growth_probs = self.run_length_probs * (1 - self.hazard_rate)
-        changepoint_prob = np.sum(self.run_length_probs) * self.hazard_rate
+        n = self.rl_len
+        if n >= self.max_run_length:
+            # 截断: 最长运行长度的概率并入前一位，总概率不变
+            self._buf[n - 2] += self._buf[n - 1]
+            n -= 1
+        if n + 1 > len(self._buf):
+            buf = np.empty(2 * len(self._buf))
+            buf[:n] = self._buf[:n]
+            self._buf = buf
         
-        # 新的运行长度分布
-        new_run_length_probs = np.zeros(len(growth_probs) + 1)
-        new_run_length_probs[0] = changepoint_prob
-        new_run_length_probs[1:] = growth_probs
+        # 预测分布: P(r_t | x_1:t-1)，原地右移一位，0 号位写入变点概率
+        changepoint_prob = self._buf[:n].sum() * self.hazard_rate
+        np.multiply(self._buf[:n], 1 - self.hazard_rate, out=self._buf[1:n + 1])
+        self._buf[0] = changepoint_prob
+        self.rl_len = n + 1
+        probs = self._buf[:n + 1]
         
-        # 创建与新运行长度分布匹配的似然向量
-        likelihood = np.full(len(new_run_length_probs), predictive_prob)
-        
-        # 似然加权
-        self.run_length_probs = new_run_length_probs * likelihood
-        
-        # 归一化（避免除零）
-        total_prob = np.sum(self.run_length_probs)
-        if total_prob > 0:
-            self.run_length_probs /= total_prob
+        # 似然对所有运行长度相同，乘上常数再归一化与直接归一化等价，
+        # 因此省去似然加权；但似然为 0 / NaN 时加权和不再为正，
+        # 仍需走均匀分布分支，故以 total_prob * predictive_prob 判断。
+        # 若改为按运行长度区分的似然，需要恢复逐元素加权
+        total_prob = probs.sum()
+        if total_prob * predictive_prob > 0:
+            probs /= total_prob
         else:
-            self.run_length_probs = np.ones(len(self.run_length_probs)) / len(self.run_length_probs)
+            probs[:] = 1.0 / len(probs)
         
         # 检测变点
-        return self.run_length_probs[0] > self.threshold
+        return probs[0] > self.threshold
+
+
+class _SDBocpdStep:
+    """
+    GAS 方差更新与 BOCPD 递推的单步状态
+    
+    批量版本的纯 Python 回退与流式版本共用此递推；均值 (偏差) 由调用方维护。
+    """
+    
+    __slots__ = ('bocpd', 'variance_t', 'nu', 'nu_plus_1', 'omega', 'alpha',
+                 'beta', 't_norm', 't_power')
+    
+    def __init__(self, variance_0: float, nu: float, omega: float, alpha: float,
+                 beta: float, hazard_rate: float, threshold: float,
+                 max_len: int, max_run_length: int):
+        self.bocpd = BayesianOnlineChangePointDetection(
+            hazard_rate, threshold, max_len=max_len, max_run_length=max_run_length,
+        )
+        self.variance_t = variance_0
+        self.nu = nu
+        self.nu_plus_1 = nu + 1.0
+        self.omega = omega
+        self.alpha = alpha
+        self.beta = beta
+        # 学生 t 密度的归一化常数只与 nu 有关，逐步直接用闭式表达式，
+        # 避免每步调用 scipy.stats.t.pdf 的分发开销
+        self.t_norm = math.exp(
+            math.lgamma((nu + 1) / 2) - math.lgamma(nu / 2) - 0.5 * math.log(nu * math.pi)
+        )
+        self.t_power = -(nu + 1) / 2
+    
+    def __call__(self, deviation: float) -> Tuple[float, float, bool]:
+        """
+        处理一个观测
+        
+        Args:
+            deviation: 观测相对当前均值的偏差 (NumPy 标量，方差为 0 时得到
+                inf / nan 而非抛异常)
+            
+        Returns:
+            (score, variance, is_changepoint)；检测到变点时方差与运行长度分布已重置
+        """
+        nu = self.nu
+        # 计算得分 (内联 ScoreDrivenModel.compute_score，标量开方用 math.sqrt)
+        sd_t = math.sqrt(self.variance_t)
+        standardized = deviation / sd_t
+        score_t = self.nu_plus_1 * standardized / (nu + standardized * standardized) * sd_t
+        
+        # 更新方差 (内联 ScoreDrivenModel.update_variance)
+        variance_t = self.omega + self.alpha * score_t * score_t + self.beta * self.variance_t
+        
+        # 计算预测概率 (基于学生 t 分布)
+        standardized = deviation / math.sqrt(variance_t)
+        predictive_prob = self.t_norm * (1 + standardized * standardized / nu) ** self.t_power
+        
+        # BOCPD 更新
+        is_changepoint = bool(self.bocpd.update(predictive_prob))
+        if is_changepoint:
+            # 重置参数: 方差回到长期方差
+            self.variance_t = self.omega / (1 - self.beta)
+            self.bocpd.reset()
+        else:
+            self.variance_t = variance_t
+        return score_t, variance_t, is_changepoint
 
 
 def rigorous_sd_bocpd(series: np.ndarray, 
                      nu: float = 5.0, omega: float = 0.01, 
                      alpha: float = 0.05, beta: float = 0.9,
-                     hazard_rate: float = 1/50, threshold: float = 0.5) -> Tuple[List[int], np.ndarray, np.ndarray]:
+                     hazard_rate: float = 1/50, threshold: float = 0.5,
+                     max_run_length: int = R_MAX) -> Tuple[List[int], np.ndarray, np.ndarray]:
     """
     严谨的 Score-Driven BOCPD 实现
     
@@ -105,56 +202,100 @@ def rigorous_sd_bocpd(series: np.ndarray,
         omega, alpha, beta: GAS 模型参数
         hazard_rate: BOCPD 变点先验概率
         threshold: 变点检测阈值
+        max_run_length: 运行长度分布的最大长度
         
     Returns:
         Tuple containing:
         - changepoints: 变点索引列表
-        - variances: 动态方差序列
-        - scores: 得分序列
+        - variances: 动态方差序列 (float32)
+        - scores: 得分序列 (float32)
     """
+    if max_run_length < 2:
+        raise ValueError("max_run_length must be >= 2")
+    # 连续缓冲区；float32 / float64 保持原样 (迭代状态始终以双精度计算)，其余类型转为 float64
+    series = np.ascontiguousarray(series)
+    if series.dtype not in (np.float32, np.float64):
+        series = series.astype(np.float64)
     n = len(series)
     if n < 2:
-        return [], np.array([]), np.array([])
+        return [], np.array([], dtype=np.float32), np.array([], dtype=np.float32)
     
-    # 初始化模型
-    gas_model = ScoreDrivenModel(nu, omega, alpha, beta)
-    bocpd = BayesianOnlineChangePointDetection(hazard_rate, threshold)
+    # 使用前几个观测初始化方差 (以 float64 运算)，内核与纯 Python 版本共用
+    variance_0 = np.var(series[:min(10, n)].astype(np.float64))
+    
+    if _sd_bocpd is not None:
+        changepoints, variances, scores = _sd_bocpd(
+            series, float(variance_0), float(nu), float(omega), float(alpha),
+            float(beta), float(hazard_rate), float(threshold), int(max_run_length)
+        )
+        return changepoints.tolist(), variances, scores
+    
+    step = _SDBocpdStep(
+        variance_0, nu, omega, alpha, beta, hazard_rate, threshold,
+        max_len=min(n, max_run_length), max_run_length=max_run_length,
+    )
     
     # 存储结果
     changepoints = []
-    variances = np.zeros(n)
-    scores = np.zeros(n)
+    # 结果序列精度要求不高，以 float32 存储减半内存
+    variances = np.zeros(n, dtype=np.float32)
+    scores = np.zeros(n, dtype=np.float32)
     
-    # 初始化
+    # 均值按 EWMA 逐步递推 (以 float64 运算)，变点处从当前观测重新开始
+    series = series.astype(np.float64, copy=False)
     mu_t = series[0]
-    variance_t = np.var(series[:min(10, n)])  # 使用前几个观测初始化方差
     
     for t in range(1, n):
         x_t = series[t]
-        
-        # 计算得分
-        score_t = gas_model.compute_score(x_t, mu_t, variance_t)
-        scores[t] = score_t
-        
-        # 更新方差 (GAS)
-        variance_t = gas_model.update_variance(variance_t, score_t)
-        variances[t] = variance_t
-        
-        # 计算预测概率 (基于学生 t 分布)
-        standardized = (x_t - mu_t) / np.sqrt(variance_t)
-        predictive_prob = stats.t.pdf(standardized, df=nu)
-        
-        # BOCPD 更新
-        is_changepoint = bocpd.update(predictive_prob)
+        scores[t], variances[t], is_changepoint = step(x_t - mu_t)
         
         if is_changepoint:
             changepoints.append(t)
-            # 重置参数
             mu_t = x_t
-            variance_t = omega / (1 - beta)  # 长期方差
-            bocpd = BayesianOnlineChangePointDetection(hazard_rate, threshold)
         else:
-            # 更新均值 (简单移动平均或 EWMA)
             mu_t = 0.95 * mu_t + 0.05 * x_t
     
     return changepoints, variances, scores
+
+
+def stream_sd_bocpd(series: Iterable[float],
+                    nu: float = 5.0, omega: float = 0.01,
+                    alpha: float = 0.05, beta: float = 0.9,
+                    hazard_rate: float = 1/50, threshold: float = 0.5,
+                    max_run_length: int = R_MAX) -> Iterator[Tuple[int, float, float, bool]]:
+    """
+    流式 Score-Driven BOCPD，逐步产出结果
+    
+    与 ``rigorous_sd_bocpd`` 共用单步递推，但不预分配结果数组：只缓存前 10 个观测
+    用于初始化方差，配合运行长度截断，内存占用与序列长度无关，适合超长序列
+    或只关心变点的场景。
+    
+    Args:
+        series: 观测值的可迭代对象 (可为生成器)
+        nu: 学生 t 分布自由度
+        omega, alpha, beta: GAS 模型参数
+        hazard_rate: BOCPD 变点先验概率
+        threshold: 变点检测阈值
+        max_run_length: 运行长度分布的最大长度
+        
+    Yields:
+        (t, score, variance, is_changepoint)，t 从 1 开始
+    """
+    observations = iter(series)
+    # 方差以前 10 个观测初始化，先缓存这一段
+    head = np.array(list(itertools.islice(observations, 10)), dtype=np.float64)
+    if len(head) < 2:
+        return
+    
+    step = _SDBocpdStep(
+        np.var(head), nu, omega, alpha, beta, hazard_rate, threshold,
+        max_len=max_run_length, max_run_length=max_run_length,
+    )
+    mu_t = head[0]
+    
+    for t, x_t in enumerate(itertools.chain(head[1:], observations), start=1):
+        # 观测转为 NumPy 标量，方差为 0 时得到 inf / nan 而非抛异常
+        x_t = np.float64(x_t)
+        score_t, variance_t, is_changepoint = step(x_t - mu_t)
+        yield t, float(score_t), float(variance_t), is_changepoint
+        mu_t = x_t if is_changepoint else 0.95 * mu_t + 0.05 * x_t
@@ -5,6 +5,6 @@
 """
 
 from .fetcher import StockDataFetcher
-from .sources import BaseDataSource, SOURCE_REGISTRY
+from .sources import BaseDataSource, SOURCE_REGISTRY, clear_cache
 
-__all__ = ['StockDataFetcher', 'BaseDataSource', 'SOURCE_REGISTRY']
+__all__ = ['StockDataFetcher', 'BaseDataSource', 'SOURCE_REGISTRY', 'clear_cache']
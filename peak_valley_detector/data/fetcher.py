@@ -2,13 +2,25 @@
 
 from __future__ import annotations
 
-from typing import Optional, Type, Dict, Union
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Type, Dict, Iterable, Tuple, Union
 
 import pandas as pd
 
 from .sources import BaseDataSource, SOURCE_REGISTRY
 from ..config import get_global_config
 
+# 同时在途的行情请求上限，所有批量请求共享，避免触发数据源限流
+MAX_CONCURRENT_REQUESTS = 4
+_REQUEST_SEMAPHORE = threading.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+
+def _weekly_close(daily: pd.DataFrame) -> pd.Series:
+    """由日线数据重采样得到周五收盘价序列."""
+    return daily["close"].resample("W-FRI").last()
+
 
 class StockDataFetcher:
     """Facade class for fetching stock data from various sources."""
@@ -131,6 +143,48 @@ class StockDataFetcher:
         source_instance = self._get_source_instance(symbol, "daily")
         return source_instance.get_hist("daily", start_date=start_date, end_date=end_date)
     
+    def get_daily_batch(
+        self,
+        symbols: Iterable[str],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        max_workers: int = 8,
+        retries: int = 3,
+        backoff: float = 0.5,
+    ) -> Dict[str, pd.DataFrame]:
+        """并发获取多只股票的日线数据.
+        
+        请求以 I/O 等待为主，使用线程池并发发出；网络错误按指数退避重试。
+        
+        Parameters
+        ----------
+        symbols: 股票代码列表，如 ["000001", "600000"]
+        start_date: 开始日期
+        end_date: 结束日期
+        max_workers: 线程池大小
+        retries: 网络错误 (``OSError``) 的最大重试次数
+        backoff: 首次重试前的等待秒数，之后每次翻倍
+        
+        Returns
+        -------
+        以股票代码为键的日线数据字典，顺序与 ``symbols`` 一致
+        """
+        symbols = list(dict.fromkeys(symbols))
+
+        def fetch(symbol: str) -> pd.DataFrame:
+            for attempt in range(retries + 1):
+                try:
+                    with _REQUEST_SEMAPHORE:
+                        return self.get_daily(symbol, start_date=start_date, end_date=end_date)
+                except OSError:
+                    if attempt == retries:
+                        raise
+                    time.sleep(backoff * 2 ** attempt)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            frames = list(executor.map(fetch, symbols))
+        return dict(zip(symbols, frames))
+    
     def get_weekly(
         self,
         symbol: str,
@@ -146,7 +200,7 @@ class StockDataFetcher:
         end_date: 结束日期
         """
         daily = self.get_daily(symbol, start_date=start_date, end_date=end_date)
-        return daily["close"].resample("W-FRI").last()
+        return _weekly_close(daily)
     
     def get_60min(
         self,
@@ -167,3 +221,35 @@ class StockDataFetcher:
             start_date=start_date,
             end_date=end_date,
         )
+    
+    def get_all(
+        self,
+        symbol: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> Tuple[pd.DataFrame, pd.Series, pd.DataFrame]:
+        """同时获取日线、周线与60分钟数据.
+        
+        日线与60分钟请求在线程池中并发发出，总耗时取两者中较慢的一个；
+        周线由日线重采样得到，不再单独请求。
+        
+        Parameters
+        ----------
+        symbol: 股票代码，如 "000001"
+        start_date: 开始日期
+        end_date: 结束日期
+        
+        Returns
+        -------
+        (daily, weekly, h1): 日线数据、周线收盘价与60分钟数据
+        """
+        def fetch(method):
+            with _REQUEST_SEMAPHORE:
+                return method(symbol, start_date=start_date, end_date=end_date)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            daily_future = executor.submit(fetch, self.get_daily)
+            h1_future = executor.submit(fetch, self.get_60min)
+            daily = daily_future.result()
+            h1 = h1_future.result()
+        return daily, _weekly_close(daily), h1
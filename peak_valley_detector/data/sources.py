@@ -2,17 +2,209 @@
 
 from __future__ import annotations
 
+import functools
+import hashlib
+import importlib.util
+import os
+import time
 from abc import ABC, abstractmethod
+from datetime import date
+from pathlib import Path
 from typing import Optional
 
-import akshare as ak
+import numpy as np
 import pandas as pd
 
-try:
-    from gm.api import history as gm_history, set_token as gm_set_token
-except Exception:  # pragma: no cover - optional
-    gm_history = None
-    gm_set_token = None
+from ..config import get_global_config
+
+# 只探测 pyarrow 是否安装而不导入，Parquet 读写时由 pandas 按需导入
+_HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+# AkShare 返回的日线 / 分钟线时间格式
+DATE_FORMAT = "%Y-%m-%d"
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# 进程内行情缓存的最大条目数
+CACHE_SIZE = 256
+
+_cache_clears = []
+
+
+def _disk_cache_path(func, args, kwargs) -> Optional[Path]:
+    """配置文件开启 cache_enabled 时返回磁盘缓存文件路径，否则返回 None.
+
+    键中包含当天日期 (YYYYMMDD)：end_date 为空的请求结果随交易日增长，
+    跨日后换用新文件，不会在 cache_ttl 内读到缺少当天行情的旧数据。
+    """
+    config = get_global_config()
+    if not config.is_cache_enabled():
+        return None
+    today = date.today().strftime("%Y%m%d")
+    key = repr((func.__name__, today, args, sorted(kwargs.items())))
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    # 有 pyarrow 时用 Parquet 列式存储，否则退回 pickle
+    suffix = ".parquet" if _HAS_PYARROW else ".pkl"
+    return Path(config.get_cache_dir()) / f"{func.__name__}-{digest}{suffix}"
+
+
+def _read_frame(path: Path, ttl: float) -> Optional[pd.DataFrame]:
+    """读取未过期的磁盘缓存，不存在或已过期时返回 None."""
+    try:
+        age = time.time() - path.stat().st_mtime
+    except FileNotFoundError:
+        return None
+    if age > ttl:
+        return None
+    if path.suffix == ".parquet":
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+
+def _write_frame(df: pd.DataFrame, path: Path) -> None:
+    """先写临时文件再原子替换，并发进程不会读到写了一半的缓存."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    if path.suffix == ".parquet":
+        df.to_parquet(tmp)
+    else:
+        df.to_pickle(tmp)
+    os.replace(tmp, path)
+
+
+def _disk_cached(func):
+    """在进程内缓存之下增加一层磁盘缓存，重复运行时无需再次请求数据源."""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        path = _disk_cache_path(func, args, kwargs)
+        if path is None:
+            return func(*args, **kwargs)
+        df = _read_frame(path, get_global_config().get_cache_ttl())
+        if df is None:
+            df = func(*args, **kwargs)
+            _write_frame(df, path)
+        return df
+
+    return wrapper
+
+
+def _cached_frame(func):
+    """按参数缓存数据源返回的 DataFrame，跨 StockDataFetcher 实例复用同一次请求。
+
+    返回缓存结果的副本，调用方修改返回值不会污染缓存。
+    配置文件开启 ``cache_enabled`` 时结果同时写入磁盘，有效期为 ``cache_ttl`` 秒。
+    """
+    cached = functools.lru_cache(maxsize=CACHE_SIZE)(_disk_cached(func))
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return cached(*args, **kwargs).copy()
+
+    _cache_clears.append(cached.cache_clear)
+    return wrapper
+
+
+def clear_cache() -> None:
+    """清空进程内行情缓存（例如盘中需要重新拉取最新数据时）."""
+    for cache_clear in _cache_clears:
+        cache_clear()
+
+
+def _sort_by_index(df: pd.DataFrame) -> pd.DataFrame:
+    """数据源通常已按时间升序返回，仅在乱序时排序."""
+    if df.index.is_monotonic_increasing:
+        return df
+    return df.sort_index()
+
+
+def _gm_api():
+    """导入掘金量化接口，不可用时抛出 ImportError.
+
+    gm.api 导入开销较大，在首次使用 MyQuant 数据源时才导入。
+    """
+    try:
+        from gm import api
+    except Exception as exc:  # pragma: no cover - optional
+        raise ImportError("MyQuant 数据接口不可用，请先安装 gm.api 并配置 token") from exc
+    return api
+
+
+@_cached_frame
+def _akshare_hist(
+    symbol: str, period: str, start_date: Optional[str], end_date: Optional[str]
+) -> pd.DataFrame:
+    df_kwargs = {
+        "symbol": symbol,
+        "period": period,
+        "adjust": "qfq",
+    }
+    # 转换日期格式为 AkShare 需要的格式 (YYYYMMDD)
+    if start_date:
+        df_kwargs["start_date"] = start_date.replace("-", "")
+    if end_date:
+        df_kwargs["end_date"] = end_date.replace("-", "")
+
+    # akshare 导入开销较大，首次请求时才导入 (之后命中 sys.modules)
+    import akshare as ak
+
+    df_raw = ak.stock_zh_a_hist(**df_kwargs)
+    # 列选择与 rename 均已返回新对象，无需再 copy
+    df = df_raw[["日期", "收盘", "最高", "最低"]].rename(
+        columns={"日期": "date", "收盘": "close", "最高": "high", "最低": "low"}
+    )
+    # 日期格式固定，显式指定 format 跳过逐行格式推断
+    df["date"] = pd.to_datetime(df["date"], format=DATE_FORMAT)
+    return _sort_by_index(df.set_index("date"))
+
+
+@_cached_frame
+def _akshare_60min(
+    symbol: str, start_date: Optional[str], end_date: Optional[str]
+) -> pd.DataFrame:
+    df_kwargs = {
+        "symbol": symbol,
+        "period": "60",
+        "adjust": "qfq",
+    }
+
+    if start_date:
+        df_kwargs["start_date"] = start_date
+    if end_date:
+        df_kwargs["end_date"] = end_date
+    import akshare as ak  # 首次请求时才导入
+
+    h1_raw = ak.stock_zh_a_hist_min_em(**df_kwargs)
+    # 由底层字符串数组解析时间并直接作为索引，不经过列赋值的索引对齐；
+    # 原 "时间" 字符串列随之去掉
+    index = pd.DatetimeIndex(
+        pd.to_datetime(h1_raw["时间"].to_numpy(), format=DATETIME_FORMAT),
+        name="datetime",
+    )
+    return _sort_by_index(h1_raw.drop(columns="时间").set_index(index))
+
+
+@_cached_frame
+def _myquant_history(index_name: str, **hist_kwargs) -> pd.DataFrame:
+    # MyQuant 返回的是 list of dict，需要转换为 DataFrame
+    data_list = _gm_api().history(**hist_kwargs)
+    if not data_list:
+        # 返回空的 DataFrame
+        return pd.DataFrame(columns=['close', 'high', 'low'],
+                            index=pd.DatetimeIndex([], name=index_name))
+
+    # 按字段逐列收集 (list of dict -> dict of array)，数值列直接生成 float64 数组，
+    # 避免 DataFrame 构造器逐行解析字典并推断类型；缺失值 (None) 记为 NaN
+    n = len(data_list)
+    columns = {}
+    for field in hist_kwargs["fields"].split(","):
+        if field != "eob":
+            columns[field] = np.fromiter(
+                (np.nan if row[field] is None else row[field] for row in data_list),
+                dtype=np.float64, count=n,
+            )
+    # eob 本身已是 datetime 对象，直接构造索引，不再经过 to_datetime 和 set_index 的列往返
+    index = pd.DatetimeIndex([row["eob"] for row in data_list], name=index_name)
+    return _sort_by_index(pd.DataFrame(columns, index=index))
 
 
 class BaseDataSource(ABC):
@@ -51,58 +243,28 @@ class AkShareSource(BaseDataSource):
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
     ) -> pd.DataFrame:
-        df_kwargs = {
-            "symbol": self.symbol,
-            "period": period,
-            "adjust": "qfq",
-        }
-        # 转换日期格式为 AkShare 需要的格式 (YYYYMMDD)
-        if start_date:
-            df_kwargs["start_date"] = start_date.replace("-", "")
-        if end_date:
-            df_kwargs["end_date"] = end_date.replace("-", "")
-        
-        df_raw = ak.stock_zh_a_hist(**df_kwargs)
-        df = (
-            df_raw[["日期", "收盘", "最高", "最低"]]
-            .rename(
-                columns={"日期": "date", "收盘": "close", "最高": "high", "最低": "low"}
-            )
-            .copy()
-        )
-        df["date"] = pd.to_datetime(df["date"])
-        return df.set_index("date").sort_index()
+        return _akshare_hist(self.symbol, period, start_date, end_date)
 
     def get_60min(
         self, start_date: Optional[str] = None, end_date: Optional[str] = None
     ) -> pd.DataFrame:
-        df_kwargs = {
-            "symbol": self.symbol,
-            "period": "60",
-            "adjust": "qfq",
-        }
-
-        if start_date:
-            df_kwargs["start_date"] = start_date
-        if end_date:
-            df_kwargs["end_date"] = end_date
-        h1_raw = ak.stock_zh_a_hist_min_em(**df_kwargs)
-        h1_raw["datetime"] = pd.to_datetime(h1_raw["时间"])
-        return h1_raw.set_index("datetime").sort_index()
+        return _akshare_60min(self.symbol, start_date, end_date)
 
 
 class MyQuantSource(BaseDataSource):
     """掘金量化数据源."""
 
+    # get_hist 的周期名到 MyQuant frequency 参数的映射
+    _FREQ_MAP = {"daily": "1d", "weekly": "1w", "60min": "60m"}
+
     def __init__(
         self,
         symbol: str,
         token: Optional[str] = None,
     ):
-        if gm_history is None:
-            raise ImportError("MyQuant 数据接口不可用，请先安装 gm.api 并配置 token")
-        if gm_set_token and token:
-            gm_set_token(token)
+        api = _gm_api()
+        if token:
+            api.set_token(token)
         super().__init__(symbol, token=token)
 
     def get_hist(
@@ -111,8 +273,6 @@ class MyQuantSource(BaseDataSource):
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
     ) -> pd.DataFrame:
-        freq_map = {"daily": "1d", "weekly": "1w", "60min": "60m"}
-        
         # 转换股票代码格式 - MyQuant需要交易所前缀
         symbol = self.symbol
         if not symbol.startswith(('SZSE.', 'SHSE.')):
@@ -123,7 +283,7 @@ class MyQuantSource(BaseDataSource):
         
         hist_kwargs = {
             "symbol": symbol,
-            "frequency": freq_map.get(period, "1d"),
+            "frequency": self._FREQ_MAP.get(period, "1d"),
             "fields": "close,high,low,eob",  # 添加 eob 字段获取日期
             "adjust": 1,  # 1 = 前复权 (qfq)
         }
@@ -133,18 +293,7 @@ class MyQuantSource(BaseDataSource):
         if end_date:
             hist_kwargs["end_time"] = end_date
             
-        # MyQuant 返回的是 list of dict，需要转换为 DataFrame
-        data_list = gm_history(**hist_kwargs)
-        if not data_list:
-            # 返回空的 DataFrame
-            return pd.DataFrame(columns=['close', 'high', 'low'], 
-                              index=pd.DatetimeIndex([], name='date'))
-        
-        # 转换为 DataFrame
-        df = pd.DataFrame(data_list)
-        df = df.rename(columns={"eob": "date"})
-        df["date"] = pd.to_datetime(df["date"])
-        return df.set_index("date").sort_index()
+        return _myquant_history("date", **hist_kwargs)
 
     def get_60min(
         self, start_date: Optional[str] = None, end_date: Optional[str] = None
@@ -169,18 +318,7 @@ class MyQuantSource(BaseDataSource):
         if end_date:
             hist_kwargs["end_time"] = end_date
 
-        # MyQuant 返回的是 list of dict，需要转换为 DataFrame
-        data_list = gm_history(**hist_kwargs)
-        if not data_list:
-            # 返回空的 DataFrame
-            return pd.DataFrame(columns=['close', 'high', 'low'], 
-                              index=pd.DatetimeIndex([], name='datetime'))
-        
-        # 转换为 DataFrame
-        df = pd.DataFrame(data_list)
-        df = df.rename(columns={"eob": "datetime"})
-        df["datetime"] = pd.to_datetime(df["datetime"])
-        return df.set_index("datetime").sort_index()
+        return _myquant_history("datetime", **hist_kwargs)
 
 
 SOURCE_REGISTRY = {
@@ -4,5 +4,6 @@
 包含通用的工具函数和辅助类
 """
 
-# 目前暂无工具函数，预留用于未来扩展
-__all__ = []
+from .indicators import average_true_range
+
+__all__ = ['average_true_range']
@@ -0,0 +1,51 @@
+"""
+技术指标模块
+使用 NumPy / SciPy 实现的轻量技术指标
+"""
+
+import numpy as np
+from scipy.signal import lfilter
+
+
+def average_true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                       window: int = 14) -> np.ndarray:
+    """
+    Wilder 平均真实波幅 (ATR)
+
+    结果与 ``ta.volatility.average_true_range`` 一致：前 window-1 个值为 0，
+    第 window 个值为前 window 个真实波幅的均值，之后按 Wilder 平滑递推。
+    递推由 ``scipy.signal.lfilter`` 在 C 层完成。
+
+    Args:
+        high: 最高价序列
+        low: 最低价序列
+        close: 收盘价序列
+        window: 平滑周期
+
+    Returns:
+        ATR 数组
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    n = len(close)
+    atr = np.zeros(n)
+    if n < window:
+        return atr
+
+    # 真实波幅: max(H-L, |H-前收|, |L-前收|)，首根K线只有 H-L
+    prev_close = close[:-1]
+    true_range = high - low
+    np.maximum(true_range[1:], np.abs(high[1:] - prev_close), out=true_range[1:])
+    np.maximum(true_range[1:], np.abs(low[1:] - prev_close), out=true_range[1:])
+
+    # Wilder 平滑: atr[i] = atr[i-1] * (window-1)/window + tr[i]/window
+    seed = true_range[:window].mean()
+    atr[window - 1] = seed
+    if n > window:
+        alpha = 1.0 / window
+        decay = 1.0 - alpha
+        atr[window:], _ = lfilter(
+            [alpha], [1.0, -decay], true_range[window:], zi=[decay * seed]
+        )
+    return atr
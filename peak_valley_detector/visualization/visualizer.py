@@ -3,29 +3,184 @@
 处理多层次峰谷检测结果的图表展示
 """
 
-import matplotlib.pyplot as plt
+import functools
 import pandas as pd
 import numpy as np
 from typing import List, Optional
 import warnings
 
-# 设置matplotlib参数
-plt.rcParams['font.family'] = 'sans-serif'
-plt.rcParams['figure.dpi'] = 110
-warnings.filterwarnings('ignore')
+
+@functools.lru_cache(maxsize=None)
+def _pyplot():
+    """
+    首次绘图时才导入并配置 matplotlib
+    
+    只使用 ``create_summary_report`` 时无需初始化 matplotlib 及其字体缓存。
+    """
+    import matplotlib.pyplot as plt
+    
+    # 设置matplotlib参数
+    plt.rcParams['font.family'] = 'sans-serif'
+    plt.rcParams['figure.dpi'] = 110
+    warnings.filterwarnings('ignore')
+    return plt
+
+# 中观 / 微观层点数可达数万: 改用 plot 的单一标记路径代替 scatter 的逐点集合，
+# 并在导出矢量图时栅格化。markersize 为直径 (pt)，对应 scatter 的 s=50 / s=25 (pt^2)
+_MID_MARKER_SIZE = 50 ** 0.5
+_MICRO_MARKER_SIZE = 25 ** 0.5
+
+# 各层极值标记: 名称 -> (取值序列所属层级, plot 样式)。
+# 标记统一为 Line2D，更新时只需 set_data，不必重建图形
+_EXTREMA_LAYERS = {
+    'macro_peaks': ('macro', dict(marker='^', markersize=90 ** 0.5, color='red',
+                                  label='Macro Peak (SD-BOCPD)', zorder=5)),
+    'macro_troughs': ('macro', dict(marker='v', markersize=90 ** 0.5, color='green',
+                                    label='Macro Trough (SD-BOCPD)', zorder=5)),
+    'mid_peaks': ('mid', dict(marker='^', markersize=_MID_MARKER_SIZE, color='orange',
+                              label='Mid Peak', alpha=0.8, zorder=4, rasterized=True)),
+    'mid_troughs': ('mid', dict(marker='v', markersize=_MID_MARKER_SIZE, color='lime',
+                                label='Mid Trough', alpha=0.8, zorder=4, rasterized=True)),
+    'micro_peaks': ('micro', dict(marker='^', markersize=_MICRO_MARKER_SIZE, color='purple',
+                                  label='Micro Peak', alpha=0.6, zorder=3, rasterized=True)),
+    'micro_troughs': ('micro', dict(marker='v', markersize=_MICRO_MARKER_SIZE, color='blue',
+                                    label='Micro Trough', alpha=0.6, zorder=3, rasterized=True)),
+}
+
+
+# 可选绘图后端，bokeh 仅在选用时导入
+BACKENDS = ('matplotlib', 'bokeh')
+
+# bokeh 画布按 matplotlib 的 figure.dpi 把英寸尺寸换算为像素
+_BOKEH_DPI = 110
+
+# matplotlib 标记到 bokeh scatter 标记名的映射
+_BOKEH_MARKERS = {'^': 'triangle', 'v': 'inverted_triangle', 'o': 'circle'}
+
+
+def _bokeh():
+    """导入 bokeh 绘图接口，未安装时给出安装提示"""
+    try:
+        from bokeh import layouts, models, plotting
+    except ImportError as exc:
+        raise ImportError("bokeh 后端不可用，请先安装 bokeh") from exc
+    return plotting, layouts, models
+
+
+def _bokeh_figure(plotting, title: str, size: tuple, y_label: str,
+                  x_label: Optional[str] = 'Date', x_range=None):
+    """创建时间轴 bokeh 画布，WebGL 渲染以支撑上万个点"""
+    kwargs = {} if x_range is None else {'x_range': x_range}
+    return plotting.figure(
+        title=title, x_axis_type='datetime', x_axis_label=x_label, y_axis_label=y_label,
+        width=int(size[0] * _BOKEH_DPI), height=int(size[1] * _BOKEH_DPI),
+        output_backend='webgl', **kwargs
+    )
+
+
+def _bokeh_scatter(p, models, dates, values, marker: str, markersize: float,
+                   color: str, alpha: float = 1.0, label: Optional[str] = None,
+                   **_) -> None:
+    """一层标记放入一个 ColumnDataSource，整层只发出一次 scatter 调用"""
+    source = models.ColumnDataSource(data={'x': dates, 'y': values})
+    kwargs = {} if label is None else {'legend_label': label}
+    p.scatter(x='x', y='y', source=source, marker=_BOKEH_MARKERS[marker],
+              size=markersize, color=color, alpha=alpha, **kwargs)
+
+
+def _values_at(series: pd.Series, dates: List) -> np.ndarray:
+    """
+    按日期列表取出序列数值
+    
+    与 ``series.loc[dates]`` 结果一致，但一次性定位所有日期后对底层数组做整数取值。
+    数据源返回的索引已按时间升序，此时用二分查找定位，无需为索引构建哈希表。
+    
+    Args:
+        series: 以日期为索引的序列
+        dates: 日期列表 (无时区的日期按索引时区解释)
+        
+    Returns:
+        与 dates 等长的数值数组
+    """
+    index = series.index
+    if len(dates) == 0:
+        return series.to_numpy()[:0]
+    # 对齐到索引时区，带时区的索引 (如 MyQuant 的 Asia/Shanghai) 不能与无时区日期比较
+    tz = getattr(index, 'tz', None)
+    dates = pd.DatetimeIndex(dates) if tz is None else pd.DatetimeIndex(dates, tz=tz)
+    if index.is_monotonic_increasing:
+        positions = index.searchsorted(dates)
+        found = positions < len(index)
+        found[found] = index[positions[found]] == dates[found]
+    else:
+        positions = index.get_indexer(dates)
+        found = positions >= 0
+    if not found.all():
+        raise KeyError(f"{list(dates[~found])} not in index")
+    return series.to_numpy()[positions]
+
+
+def _simple_returns(series: pd.Series) -> tuple:
+    """
+    计算简单收益率，结果与 ``series.pct_change().dropna()`` 一致
+    
+    Args:
+        series: 价格序列
+        
+    Returns:
+        (dates, returns): 收益率对应的日期索引和数值数组
+    """
+    values = series.to_numpy(dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = values[1:] / values[:-1] - 1
+    valid = ~np.isnan(returns)
+    return series.index[1:][valid], returns[valid]
+
+
+def _changepoint_coords(series: pd.Series, changepoints: List[int]) -> tuple:
+    """
+    取出变点对应的日期和数值 (超出序列长度的变点被忽略)
+    
+    Args:
+        series: 时间序列数据
+        changepoints: 变点索引列表
+        
+    Returns:
+        (cp_dates, cp_values): 变点日期索引和数值数组
+    """
+    cps = np.asarray(changepoints, dtype=np.intp)
+    cps = cps[cps < len(series)]
+    # take 一次性按位置取值，跳过 __getitem__ 的键类型分派，也不逐点装箱 Timestamp
+    return series.index.take(cps), series.to_numpy().take(cps)
 
 
 class MultiLayerVisualizer:
-    """多层次峰谷检测结果可视化器"""
+    """
+    多层次峰谷检测结果可视化器
     
-    def __init__(self, figsize: tuple = (12, 6)):
+    每种图表先由 ``_prepare_*`` 整理为日期 / 数值数组，再交给所选后端的
+    ``_render_*_<backend>`` 绘制，数据整理与绘图调用互不依赖。
+    """
+    
+    def __init__(self, figsize: tuple = (12, 6), backend: str = 'matplotlib'):
         """
         初始化可视化器
         
         Args:
             figsize: 图表尺寸
+            backend: 'matplotlib' 或 'bokeh' (WebGL 渲染，适合上万个点的交互浏览)
         """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unsupported backend: {backend}")
         self.figsize = figsize
+        self.backend = backend
+        # 最近一次 plot_multi_layer_results 的取值序列与图形句柄，供 update_multi_layer_results 复用
+        self._sources = None
+        self._live = None
+    
+    def _render(self, name: str, *args) -> None:
+        """按当前后端分派到 ``_render_<name>_<backend>``"""
+        getattr(self, f'_render_{name}_{self.backend}')(*args)
     
     def plot_multi_layer_results(self, 
                                 symbol: str,
@@ -53,58 +208,84 @@ class MultiLayerVisualizer:
             micro_peaks: 微观峰值日期列表
             micro_troughs: 微观谷值日期列表
         """
+        sources = {
+            'macro': weekly_data,
+            'mid': daily_data['close'],
+            'micro': h1_data['收盘'],
+        }
+        data = self._prepare_multi_layer(daily_data, sources, dict(
+            macro_peaks=macro_peaks, macro_troughs=macro_troughs,
+            mid_peaks=mid_peaks, mid_troughs=mid_troughs,
+            micro_peaks=micro_peaks, micro_troughs=micro_troughs,
+        ))
+        # 取值序列留给 update_multi_layer_results 复用
+        self._sources = sources
+        self._render('multi_layer', symbol, data)
+    
+    @staticmethod
+    def _prepare_multi_layer(daily_data: pd.DataFrame, sources: dict, extrema: dict) -> dict:
+        """整理多层次图数据: 日线收盘价与各层极值的 (日期, 数值)"""
+        return {
+            'price': (daily_data.index, daily_data['close'].to_numpy()),
+            'extrema': MultiLayerVisualizer._prepare_extrema(sources, extrema),
+        }
+    
+    @staticmethod
+    def _prepare_extrema(sources: dict, extrema: dict) -> dict:
+        """
+        按层级取出各层极值日期对应的价格
+        
+        Args:
+            sources: 层级 ('macro' / 'mid' / 'micro') -> 取值序列
+            extrema: 极值层名称 -> 日期列表
+            
+        Returns:
+            极值层名称 -> (日期索引, 数值数组)
+        """
+        coords = {}
+        for name, dates in extrema.items():
+            layer = _EXTREMA_LAYERS[name][0]
+            dates = pd.DatetimeIndex(dates)
+            coords[name] = (dates, _values_at(sources[layer], dates))
+        return coords
+    
+    def _render_multi_layer_matplotlib(self, symbol: str, data: dict) -> None:
+        """matplotlib 绘制多层次图，并保留句柄供增量更新"""
+        plt = _pyplot()
         fig, ax = plt.subplots(figsize=self.figsize)
         
         # 绘制主要价格线（日线）
-        ax.plot(daily_data.index, daily_data['close'], 
-               label='Close Price', linewidth=1, color='black', alpha=0.8)
-        
-        # 宏观层 (Score-Driven BOCPD)
-        if len(macro_peaks) > 0:
-            ax.scatter(macro_peaks, weekly_data.loc[macro_peaks],
-                      marker='^', s=90, color='red', 
-                      label='Macro Peak (SD-BOCPD)', zorder=5)
-        
-        if len(macro_troughs) > 0:
-            ax.scatter(macro_troughs, weekly_data.loc[macro_troughs],
-                      marker='v', s=90, color='green', 
-                      label='Macro Trough (SD-BOCPD)', zorder=5)
-        
-        # 中观层
-        if len(mid_peaks) > 0:
-            ax.scatter(mid_peaks, daily_data.loc[mid_peaks, 'close'],
-                      marker='^', s=50, color='orange', 
-                      label='Mid Peak', alpha=0.8, zorder=4)
-        
-        if len(mid_troughs) > 0:
-            ax.scatter(mid_troughs, daily_data.loc[mid_troughs, 'close'],
-                      marker='v', s=50, color='lime', 
-                      label='Mid Trough', alpha=0.8, zorder=4)
-        
-        # 微观层（使用右轴）
-        if len(micro_peaks) > 0 or len(micro_troughs) > 0:
-            ax2 = ax.twinx()
-            
-            if len(micro_peaks) > 0:
-                ax2.scatter(micro_peaks, h1_data.loc[micro_peaks, '收盘'],
-                           marker='^', s=25, color='purple', 
-                           label='Micro Peak', alpha=0.6, zorder=3)
-            
-            if len(micro_troughs) > 0:
-                ax2.scatter(micro_troughs, h1_data.loc[micro_troughs, '收盘'],
-                           marker='v', s=25, color='blue', 
-                           label='Micro Trough', alpha=0.6, zorder=3)
-            
-            # 同步y轴范围
-            ax2.set_ylim(ax.get_ylim())
-            ax2.set_ylabel('60min Price', fontsize=10, alpha=0.7)
+        price_line, = ax.plot(*data['price'], 
+                             label='Close Price', linewidth=1, color='black', alpha=0.8)
+        
+        # 微观层使用右轴，与主轴共享 y 轴，范围统一自动缩放并随缩放/平移联动
+        ax2 = ax.twinx()
+        ax2.sharey(ax)
+        ax2.set_ylabel('60min Price', fontsize=10, alpha=0.7)
+        
+        # 宏观层 (Score-Driven BOCPD) / 中观层 / 微观层标记，空层也建好句柄以便后续更新
+        markers = {}
+        for name, (layer, style) in _EXTREMA_LAYERS.items():
+            target = ax2 if layer == 'micro' else ax
+            markers[name], = target.plot([], [], linestyle='None', **style)
+        
+        self._live = {
+            'fig': fig,
+            'ax': ax,
+            'ax2': ax2,
+            'price_line': price_line,
+            'markers': markers,
+            'background': None,
+        }
+        fig.canvas.mpl_connect('resize_event', self._invalidate_background)
+        self._set_extrema(data['extrema'])
+        self._rescale()
         
         # 设置图表属性
         ax.set_title(f"{symbol} – Multi-Layer Peaks & Troughs (SD-BOCPD)", 
                     fontsize=14, fontweight='bold')
         ax.set_xlabel('Date', fontsize=12)
         ax.set_ylabel('Price', fontsize=12)
-        ax.legend(loc='upper left', fontsize=9, framealpha=0.9)
         ax.grid(True, alpha=0.3, linestyle='--')
         
         # 自动调整日期显示
@@ -113,6 +294,140 @@ class MultiLayerVisualizer:
         plt.tight_layout()
         plt.show()
     
+    def _render_multi_layer_bokeh(self, symbol: str, data: dict) -> None:
+        """bokeh 绘制多层次图，每层极值一个 ColumnDataSource、一次 scatter 调用"""
+        plotting, layouts, models = _bokeh()
+        p = _bokeh_figure(plotting, f"{symbol} – Multi-Layer Peaks & Troughs (SD-BOCPD)",
+                          self.figsize, 'Price')
+        p.line(*data['price'], color='black', alpha=0.8, line_width=1,
+               legend_label='Close Price')
+        for name, (dates, values) in data['extrema'].items():
+            if len(dates) > 0:
+                _bokeh_scatter(p, models, dates, values, **_EXTREMA_LAYERS[name][1])
+        p.legend.location = 'top_left'
+        plotting.show(p)
+    
+    def update_multi_layer_results(self,
+                                   macro_peaks: List,
+                                   macro_troughs: List,
+                                   mid_peaks: List,
+                                   mid_troughs: List,
+                                   micro_peaks: List,
+                                   micro_troughs: List) -> None:
+        """
+        在最近一次 ``plot_multi_layer_results`` 的图形上更新各层峰谷标记
+        
+        价格线等静态部分不重绘: 新标记落在当前坐标范围内时，恢复缓存的背景后
+        只重画标记并 blit；超出范围或画布不支持 blit 时才整体重绘一次。
+        适用于实时刷新的场景 (需开启交互模式 ``plt.ion()``)，仅支持 matplotlib 后端。
+        
+        Args:
+            macro_peaks: 宏观峰值日期列表
+            macro_troughs: 宏观谷值日期列表
+            mid_peaks: 中观峰值日期列表
+            mid_troughs: 中观谷值日期列表
+            micro_peaks: 微观峰值日期列表
+            micro_troughs: 微观谷值日期列表
+        """
+        if self.backend != 'matplotlib':
+            raise ValueError(f"Unsupported backend for incremental update: {self.backend}")
+        live = self._live
+        if live is None or not _pyplot().fignum_exists(live['fig'].number):
+            raise RuntimeError("请先调用 plot_multi_layer_results 创建图形")
+        
+        self._set_extrema(self._prepare_extrema(self._sources, dict(
+            macro_peaks=macro_peaks, macro_troughs=macro_troughs,
+            mid_peaks=mid_peaks, mid_troughs=mid_troughs,
+            micro_peaks=micro_peaks, micro_troughs=micro_troughs,
+        )))
+        
+        canvas = live['fig'].canvas
+        if (live['background'] is None or not canvas.supports_blit
+                or not self._markers_in_view()):
+            self._rescale()
+            self._redraw()
+            return
+        
+        canvas.restore_region(live['background'])
+        self._draw_markers()
+        canvas.blit(live['fig'].bbox)
+        canvas.flush_events()
+    
+    def _set_extrema(self, coords: dict) -> None:
+        """写入各层标记数据，微观层为空时隐藏右轴"""
+        live = self._live
+        was_empty = {name: len(line.get_xdata()) == 0
+                     for name, line in live['markers'].items()}
+        for name, (dates, values) in coords.items():
+            live['markers'][name].set_data(dates, values)
+        live['ax2'].set_visible(
+            len(coords['micro_peaks'][0]) > 0 or len(coords['micro_troughs'][0]) > 0
+        )
+        # 有层由空变为非空 (或反之) 时图例和右轴随之变化，缓存的背景失效
+        if any(was_empty[name] != (len(dates) == 0) for name, (dates, _) in coords.items()):
+            self._invalidate_background()
+    
+    def _rescale(self) -> None:
+        """按当前数据重新计算坐标范围，并只为非空层生成图例"""
+        live = self._live
+        ax, ax2 = live['ax'], live['ax2']
+        ax.relim()
+        ax2.relim()
+        ax.autoscale_view()
+        ax2.autoscale_view()
+        # 图例句柄直接取自保存的线条，不必让 legend 遍历坐标轴上的全部对象
+        handles = [live['price_line']] + [
+            line for name, line in live['markers'].items()
+            if _EXTREMA_LAYERS[name][0] != 'micro' and len(line.get_xdata()) > 0
+        ]
+        ax.legend(handles=handles, loc='upper left', fontsize=9, framealpha=0.9)
+    
+    def _markers_in_view(self) -> bool:
+        """所有非空标记是否都落在当前坐标范围内"""
+        live = self._live
+        (x0, x1), (y0, y1) = live['ax'].get_xlim(), live['ax'].get_ylim()
+        for line in live['markers'].values():
+            xy = line.get_xydata()
+            if len(xy) == 0:
+                continue
+            if (xy[:, 0].min() < x0 or xy[:, 0].max() > x1
+                    or xy[:, 1].min() < y0 or xy[:, 1].max() > y1):
+                return False
+        return True
+    
+    def _redraw(self) -> None:
+        """整体重绘，并缓存不含标记的静态背景供后续 blit 使用"""
+        live = self._live
+        canvas = live['fig'].canvas
+        markers = live['markers'].values()
+        if canvas.supports_blit:
+            for line in markers:
+                line.set_visible(False)
+            canvas.draw()
+            live['background'] = canvas.copy_from_bbox(live['fig'].bbox)
+            for line in markers:
+                line.set_visible(True)
+            self._draw_markers()
+            canvas.blit(live['fig'].bbox)
+        else:
+            canvas.draw_idle()
+        canvas.flush_events()
+    
+    def _draw_markers(self) -> None:
+        """只重画各层标记"""
+        live = self._live
+        for name, line in live['markers'].items():
+            if _EXTREMA_LAYERS[name][0] == 'micro':
+                if live['ax2'].get_visible():
+                    live['ax2'].draw_artist(line)
+            else:
+                live['ax'].draw_artist(line)
+    
+    def _invalidate_background(self, event=None) -> None:
+        """画布尺寸变化后缓存的背景失效"""
+        if self._live is not None:
+            self._live['background'] = None
+    
     def plot_changepoint_analysis(self, 
                                  series: pd.Series,
                                  changepoints: List[int],
@@ -125,25 +440,40 @@ class MultiLayerVisualizer:
             changepoints: 变点索引列表
             title: 图表标题
         """
+        self._render('changepoint_analysis', title,
+                     self._prepare_changepoint_analysis(series, changepoints))
+    
+    @staticmethod
+    def _prepare_changepoint_analysis(series: pd.Series, changepoints: List[int]) -> dict:
+        """整理变点分析图数据: 价格、变点坐标与收益率"""
+        return {
+            'price': (series.index, series.to_numpy()),
+            'n_changepoints': len(changepoints),
+            'changepoints': _changepoint_coords(series, changepoints),
+            'returns': _simple_returns(series),
+        }
+    
+    def _render_changepoint_analysis_matplotlib(self, title: str, data: dict) -> None:
+        """matplotlib 绘制变点分析图"""
+        plt = _pyplot()
         fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 8), sharex=True)
         
         # 上图：原始序列和变点
-        ax1.plot(series.index, series.values, 'b-', linewidth=1, alpha=0.8)
+        ax1.plot(*data['price'], 'b-', linewidth=1, alpha=0.8)
         
-        if changepoints:
-            cp_dates = [series.index[cp] for cp in changepoints if cp < len(series)]
-            cp_values = [series.iloc[cp] for cp in changepoints if cp < len(series)]
-            ax1.scatter(cp_dates, cp_values, color='red', s=50, 
-                       marker='o', zorder=5, label=f'{len(changepoints)} Change Points')
+        handles = []
+        if data['n_changepoints'] > 0:
+            handles.append(ax1.scatter(*data['changepoints'], color='red', s=50, 
+                                       marker='o', zorder=5,
+                                       label=f"{data['n_changepoints']} Change Points"))
         
         ax1.set_title(title, fontsize=14)
         ax1.set_ylabel('Price', fontsize=12)
-        ax1.legend()
+        ax1.legend(handles=handles)
         ax1.grid(True, alpha=0.3)
         
         # 下图：收益率序列
-        returns = series.pct_change().dropna()
-        ax2.plot(returns.index, returns.values, 'g-', linewidth=0.8, alpha=0.7)
+        ax2.plot(*data['returns'], 'g-', linewidth=0.8, alpha=0.7)
         ax2.axhline(y=0, color='black', linestyle='-', alpha=0.3)
         ax2.set_title('Returns', fontsize=12)
         ax2.set_xlabel('Date', fontsize=12)
@@ -153,6 +483,22 @@ class MultiLayerVisualizer:
         plt.tight_layout()
         plt.show()
     
+    def _render_changepoint_analysis_bokeh(self, title: str, data: dict) -> None:
+        """bokeh 绘制变点分析图，上下两图共享时间轴"""
+        plotting, layouts, models = _bokeh()
+        top = _bokeh_figure(plotting, title, (12, 4), 'Price', x_label=None)
+        top.line(*data['price'], color='blue', alpha=0.8, line_width=1)
+        if data['n_changepoints'] > 0:
+            _bokeh_scatter(top, models, *data['changepoints'], marker='o',
+                           markersize=50 ** 0.5, color='red',
+                           label=f"{data['n_changepoints']} Change Points")
+        
+        bottom = _bokeh_figure(plotting, 'Returns', (12, 4), 'Return', x_range=top.x_range)
+        bottom.line(*data['returns'], color='green', alpha=0.7, line_width=0.8)
+        bottom.add_layout(models.Span(location=0, dimension='width',
+                                      line_color='black', line_alpha=0.3))
+        plotting.show(layouts.column(top, bottom))
+    
     def plot_score_driven_diagnostics(self, 
                                      series: pd.Series,
                                      scores: np.ndarray,
@@ -167,31 +513,50 @@ class MultiLayerVisualizer:
             variances: 方差序列
             changepoints: 变点列表
         """
+        self._render('score_driven_diagnostics',
+                     self._prepare_score_driven_diagnostics(series, scores, variances,
+                                                            changepoints))
+    
+    @staticmethod
+    def _prepare_score_driven_diagnostics(series: pd.Series,
+                                          scores: np.ndarray,
+                                          variances: np.ndarray,
+                                          changepoints: List[int]) -> dict:
+        """整理诊断图数据，得分 / 方差为空时对应面板数据为 None"""
+        return {
+            'price': (series.index, series.to_numpy()),
+            'n_changepoints': len(changepoints),
+            'changepoints': _changepoint_coords(series, changepoints),
+            'scores': (series.index[1:len(scores)+1], scores[1:]) if len(scores) > 0 else None,
+            'variances': (
+                (series.index[1:len(variances)+1], variances[1:]) if len(variances) > 0 else None
+            ),
+        }
+    
+    def _render_score_driven_diagnostics_matplotlib(self, data: dict) -> None:
+        """matplotlib 绘制诊断图"""
+        plt = _pyplot()
         fig, axes = plt.subplots(3, 1, figsize=(12, 10), sharex=True)
         
         # 价格序列
-        axes[0].plot(series.index, series.values, 'b-', linewidth=1)
-        if changepoints:
-            cp_dates = [series.index[cp] for cp in changepoints if cp < len(series)]
-            cp_values = [series.iloc[cp] for cp in changepoints if cp < len(series)]
-            axes[0].scatter(cp_dates, cp_values, color='red', s=40, zorder=5)
+        axes[0].plot(*data['price'], 'b-', linewidth=1)
+        if data['n_changepoints'] > 0:
+            axes[0].scatter(*data['changepoints'], color='red', s=40, zorder=5)
         axes[0].set_title('Price Series with Change Points', fontsize=12)
         axes[0].set_ylabel('Price')
         axes[0].grid(True, alpha=0.3)
         
         # 得分序列
-        if len(scores) > 0:
-            score_dates = series.index[1:len(scores)+1]
-            axes[1].plot(score_dates, scores[1:], 'orange', linewidth=1)
+        if data['scores'] is not None:
+            axes[1].plot(*data['scores'], 'orange', linewidth=1)
             axes[1].axhline(y=0, color='black', linestyle='-', alpha=0.3)
             axes[1].set_title('GAS Model Scores', fontsize=12)
             axes[1].set_ylabel('Score')
             axes[1].grid(True, alpha=0.3)
         
         # 动态方差序列
-        if len(variances) > 0:
-            var_dates = series.index[1:len(variances)+1]
-            axes[2].plot(var_dates, variances[1:], 'green', linewidth=1)
+        if data['variances'] is not None:
+            axes[2].plot(*data['variances'], 'green', linewidth=1)
             axes[2].set_title('Dynamic Variance', fontsize=12)
             axes[2].set_xlabel('Date')
             axes[2].set_ylabel('Variance')
@@ -199,7 +564,33 @@ class MultiLayerVisualizer:
         
         plt.tight_layout()
         plt.show()
-
+    
+    def _render_score_driven_diagnostics_bokeh(self, data: dict) -> None:
+        """bokeh 绘制诊断图，各面板共享时间轴"""
+        plotting, layouts, models = _bokeh()
+        price = _bokeh_figure(plotting, 'Price Series with Change Points', (12, 10 / 3),
+                              'Price', x_label=None)
+        price.line(*data['price'], color='blue', line_width=1)
+        if data['n_changepoints'] > 0:
+            _bokeh_scatter(price, models, *data['changepoints'], marker='o',
+                           markersize=40 ** 0.5, color='red')
+        panels = [price]
+        
+        if data['scores'] is not None:
+            scores = _bokeh_figure(plotting, 'GAS Model Scores', (12, 10 / 3), 'Score',
+                                   x_label=None, x_range=price.x_range)
+            scores.line(*data['scores'], color='orange', line_width=1)
+            scores.add_layout(models.Span(location=0, dimension='width',
+                                          line_color='black', line_alpha=0.3))
+            panels.append(scores)
+        
+        if data['variances'] is not None:
+            variances = _bokeh_figure(plotting, 'Dynamic Variance', (12, 10 / 3), 'Variance',
+                                      x_range=price.x_range)
+            variances.line(*data['variances'], color='green', line_width=1)
+            panels.append(variances)
+        
+        plotting.show(layouts.column(*panels))
 
 def create_summary_report(symbol: str,
                          macro_peaks_count: int,
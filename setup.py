@@ -4,6 +4,29 @@ Peak Valley Detector 多层次峰谷检测系统安装配置
 
 from setuptools import setup, find_packages
 
+try:
+    import numpy as np
+    from Cython.Build import cythonize
+    from setuptools import Extension
+except ImportError:  # pragma: no cover - optional
+    cythonize = None
+
+# 极值分类内核可选预编译 (构建依赖见 pyproject.toml)；未安装 Cython 或编译失败时
+# 运行期回退到 numba / NumPy 实现
+ext_modules = []
+if cythonize is not None:
+    ext_modules = cythonize(
+        [
+            Extension(
+                "peak_valley_detector.core._extrema_cy",
+                ["peak_valley_detector/core/_extrema_cy.pyx"],
+                include_dirs=[np.get_include()],
+                optional=True,
+            )
+        ],
+        compiler_directives={"language_level": "3"},
+    )
+
 with open("README.md", "r", encoding="utf-8") as fh:
     long_description = fh.read()
 
@@ -20,6 +43,7 @@ setup(
     long_description_content_type="text/markdown",
     url="https://github.com/example/peak-valley-detector",
     packages=find_packages(),
+    ext_modules=ext_modules,
     classifiers=[
         "Development Status :: 4 - Beta",
         "Intended Audience :: Financial and Insurance Industry",
@@ -36,6 +60,10 @@ setup(
     python_requires=">=3.8",
     install_requires=requirements,
     extras_require={
+        "fast": [
+            "numba",
+            "joblib>=1.3",
+        ],
         "dev": [
             "pytest>=7.0",
             "pytest-cov>=4.0",
@@ -0,0 +1,49 @@
+"""
+测试共用数据
+
+合成序列在整个测试会话中只生成一次，各测试只读使用；磁盘缓存在测试中关闭。
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+
+
+@pytest.fixture(scope='session', autouse=True)
+def no_disk_cache():
+    """测试中关闭磁盘缓存，不受本地配置文件的 cache_enabled 影响"""
+    from peak_valley_detector.config import DataSourceConfig
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(DataSourceConfig, 'is_cache_enabled', lambda self: False)
+        yield
+
+
+@pytest.fixture(scope='session')
+def random_series():
+    """100 点标准正态随机序列 (只读)"""
+    rng = np.random.RandomState(42)
+    series = rng.randn(100)
+    series.flags.writeable = False
+    return series
+
+
+@pytest.fixture(scope='session')
+def sine_series():
+    """带噪声的两周期正弦序列，按日索引"""
+    rng = np.random.RandomState(42)
+    dates = pd.date_range('2024-01-01', periods=100, freq='D')
+    values = np.sin(np.linspace(0, 4*np.pi, 100)) + rng.randn(100) * 0.1
+    return pd.Series(values, index=dates)
+
+
+@pytest.fixture(scope='session')
+def flat_start_series():
+    """100 条开头为常数段的随机游走序列 (初始方差为 0，触发 BOCPD 退化分支)"""
+    rng = np.random.RandomState(7)
+    cases = []
+    for _ in range(100):
+        series = np.cumsum(rng.randn(120)) + rng.uniform(1, 100)
+        series[:rng.randint(1, 15)] = rng.uniform(1, 100)
+        series.flags.writeable = False
+        cases.append(series)
+    return cases
@@ -4,9 +4,16 @@
 
 import pytest
 import numpy as np
-import pandas as pd
-from peak_valley_detector.core.score_driven_bocpd import ScoreDrivenModel, rigorous_sd_bocpd
-from peak_valley_detector.core.changepoint_detector import HybridChangePointDetector, ExtremaClassifier
+from peak_valley_detector.core.score_driven_bocpd import (
+    ScoreDrivenModel, BayesianOnlineChangePointDetection, rigorous_sd_bocpd, stream_sd_bocpd
+)
+from peak_valley_detector.core.changepoint_detector import (
+    HybridChangePointDetector, ExtremaClassifier, CostL2Cumsum
+)
+from peak_valley_detector.core.extrema import local_extrema, peaks_troughs_distance
+from peak_valley_detector.core import _extrema_gpu
+from peak_valley_detector.core._extrema_numba import _classify_kernel, _classify_numpy
+from peak_valley_detector.utils.indicators import average_true_range
 
 
 class TestScoreDrivenModel:
@@ -42,54 +49,206 @@ class TestScoreDrivenModel:
 class TestChangePointDetector:
     """测试变点检测器"""
     
-    def setup_method(self):
-        """设置测试数据"""
-        np.random.seed(42)
-        self.series = np.random.randn(100)
-        self.detector = HybridChangePointDetector()
-    
     def test_initialization(self):
         """测试检测器初始化"""
         detector = HybridChangePointDetector()
         assert detector is not None
     
-    def test_detect_ruptures_dynp(self):
+    def test_detect_ruptures_dynp(self, random_series):
         """测试 Ruptures Dynp 算法"""
-        changepoints = self.detector.detect_ruptures_dynp(self.series, n_bkps=5)
-        assert isinstance(changepoints, list)
-        assert all(isinstance(cp, int) for cp in changepoints)
+        detector = HybridChangePointDetector()
+        changepoints = detector.detect_ruptures_dynp(random_series, n_bkps=5)
+        assert isinstance(changepoints, np.ndarray)
+        assert np.issubdtype(changepoints.dtype, np.integer)
+    
+    def test_cost_l2_cumsum_matches_builtin(self, random_series):
+        """测试前缀和 L2 代价与 ruptures 内置 CostL2 一致"""
+        import ruptures as rpt
+        builtin = rpt.costs.CostL2().fit(random_series)
+        cumsum = CostL2Cumsum().fit(random_series)
+        for start, end in [(0, 100), (0, 1), (10, 37), (50, 51), (99, 100)]:
+            assert cumsum.error(start, end) == pytest.approx(builtin.error(start, end))
     
-    def test_detect_volatility_based(self):
+    def test_result_cache_is_opt_in(self, random_series, tmp_path, monkeypatch):
+        """测试变点结果缓存仅在配置开启时写入 cache_dir"""
+        pytest.importorskip("joblib")
+        from peak_valley_detector.config import DataSourceConfig
+        monkeypatch.chdir(tmp_path)
+        detector = HybridChangePointDetector()
+        expected = detector.detect_ruptures_dynp(random_series, n_bkps=3)
+        assert list(tmp_path.iterdir()) == []
+        
+        monkeypatch.setattr(DataSourceConfig, 'is_cache_enabled', lambda self: True)
+        monkeypatch.setattr(DataSourceConfig, 'get_cache_dir', lambda self: str(tmp_path / 'cache'))
+        np.testing.assert_array_equal(detector.detect_ruptures_dynp(random_series, n_bkps=3), expected)
+        np.testing.assert_array_equal(detector.detect_ruptures_dynp(random_series, n_bkps=3), expected)
+        assert [p.name for p in tmp_path.iterdir()] == ['cache']
+    
+    def test_detect_volatility_based(self, random_series):
         """测试基于波动率的检测"""
-        changepoints = self.detector.detect_volatility_based(self.series)
+        detector = HybridChangePointDetector()
+        changepoints = detector.detect_volatility_based(random_series)
         assert isinstance(changepoints, list)
+    
+    def test_detect_comprehensive_returns_int64_array(self, sine_series, monkeypatch):
+        """测试综合检测无论采用哪个方法的结果都返回 int64 数组"""
+        detector = HybridChangePointDetector()
+        prices = (sine_series + 10).to_numpy()
+        # 依次让前面的方法无结果，当前方法返回列表
+        for method in ('detect_ruptures_dynp', 'detect_ruptures_bottom_up',
+                       'detect_sd_bocpd', 'detect_volatility_based'):
+            monkeypatch.setattr(detector, method, lambda *args, **kwargs: [3, 7])
+            changepoints = detector.detect_comprehensive(prices)
+            assert changepoints.dtype == np.int64
+            np.testing.assert_array_equal(changepoints, [3, 7])
+            monkeypatch.setattr(detector, method, lambda *args, **kwargs: [])
+    
+    def test_detect_volatility_based_series_input(self, sine_series):
+        """测试 pd.Series 输入与 ndarray 输入结果一致"""
+        detector = HybridChangePointDetector()
+        prices = sine_series + 10
+        expected = detector.detect_volatility_based(prices.to_numpy())
+        assert detector.detect_volatility_based(prices) == expected
+        assert len(expected) > 0
 
 
 class TestExtremaClassifier:
     """测试极值点分类器"""
     
-    def setup_method(self):
-        """设置测试数据"""
-        dates = pd.date_range('2024-01-01', periods=100, freq='D')
-        values = np.sin(np.linspace(0, 4*np.pi, 100)) + np.random.randn(100) * 0.1
-        self.series = pd.Series(values, index=dates)
-    
-    def test_classify_extrema(self):
+    def test_classify_extrema(self, sine_series):
         """测试极值点分类"""
         # 测试峰值
         result = ExtremaClassifier.classify_extrema(
-            self.series.values, 25, window=3
+            sine_series.values, 25, window=3
         )
         assert result in ['peak', 'trough', None]
     
-    def test_classify_changepoints(self):
+    def test_classify_changepoints(self, sine_series):
         """测试变点分类"""
         changepoints = [10, 30, 50, 70]
         peaks, troughs = ExtremaClassifier.classify_changepoints(
-            self.series, changepoints, window=2
+            sine_series, changepoints, window=2
         )
-        assert isinstance(peaks, list)
-        assert isinstance(troughs, list)
+        assert isinstance(peaks, np.ndarray)
+        assert isinstance(troughs, np.ndarray)
+    
+    def test_classify_changepoints_matches_classify_extrema(self, sine_series):
+        """测试批量分类与单点分类结果一致"""
+        changepoints = list(range(0, 100, 3))
+        for check_right in (True, False):
+            peaks, troughs = ExtremaClassifier.classify_changepoints(
+                sine_series, changepoints, window=2, check_right=check_right
+            )
+            expected = {
+                idx: ExtremaClassifier.classify_extrema(
+                    sine_series.values, idx, window=2, check_right=check_right
+                )
+                for idx in changepoints
+            }
+            assert list(peaks) == [
+                sine_series.index[i] for i, t in expected.items() if t == 'peak'
+            ]
+            assert list(troughs) == [
+                sine_series.index[i] for i, t in expected.items() if t == 'trough'
+            ]
+
+    def test_classify_many_matches_classify_extrema(self, sine_series):
+        """测试批量分类掩码与单点分类结果一致"""
+        values = sine_series.values
+        indices = np.arange(100)
+        for check_right in (True, False):
+            is_peak, is_trough = ExtremaClassifier.classify_many(
+                values, indices, window=3, check_right=check_right
+            )
+            expected = [
+                ExtremaClassifier.classify_extrema(values, i, window=3, check_right=check_right)
+                for i in indices
+            ]
+            assert list(is_peak) == [t == 'peak' for t in expected]
+            assert list(is_trough) == [t == 'trough' for t in expected]
+    
+    def test_vectorized_fallback_matches_kernel(self, sine_series):
+        """测试向量化回退实现与逐点内核结果一致"""
+        values = np.ascontiguousarray(sine_series.values, dtype=np.float64)
+        cps = np.arange(0, 100, dtype=np.int64)
+        for window in (0, 1, 2, 3):
+            for check_right in (True, False):
+                np.testing.assert_array_equal(
+                    _classify_numpy(values, cps, window, check_right),
+                    _classify_kernel(values, cps, window, check_right),
+                )
+
+
+class TestLocalExtrema:
+    """测试局部极值检测"""
+    
+    def test_matches_argrelextrema(self):
+        """测试与 argrelextrema 结果一致"""
+        from scipy.signal import argrelextrema
+        np.random.seed(42)
+        values = np.cumsum(np.random.randn(200))
+        peaks, troughs = local_extrema(values, order=12)
+        assert np.array_equal(peaks, argrelextrema(values, np.greater, order=12)[0])
+        assert np.array_equal(troughs, argrelextrema(values, np.less, order=12)[0])
+    
+    def test_plateau_is_not_extremum(self):
+        """测试平台不被视为严格极值"""
+        values = np.array([1.0, 2.0, 3.0, 3.0, 2.0, 1.0])
+        peaks, troughs = local_extrema(values, order=1)
+        assert len(peaks) == 0
+        assert len(troughs) == 0
+    
+    def test_peaks_troughs_distance_matches_find_peaks(self):
+        """测试与 find_peaks(distance=...) 结果一致"""
+        from scipy.signal import find_peaks
+        np.random.seed(42)
+        values = np.round(np.cumsum(np.random.randn(300)), 1)
+        peaks, troughs = peaks_troughs_distance(values, distance=6, backend='cpu')
+        assert np.array_equal(peaks, find_peaks(values, distance=6)[0])
+        assert np.array_equal(troughs, find_peaks(-values, distance=6)[0])
+    
+    def test_nan_matches_scipy(self):
+        """测试含 NaN 的序列与 argrelextrema / find_peaks 结果一致"""
+        from scipy.signal import argrelextrema, find_peaks
+        rng = np.random.RandomState(3)
+        for _ in range(200):
+            values = np.round(np.cumsum(rng.randn(60)))
+            values[rng.randint(0, 60, 3)] = np.nan
+            peaks, troughs = local_extrema(values, order=3, backend='cpu')
+            assert np.array_equal(peaks, argrelextrema(values, np.greater, order=3)[0])
+            assert np.array_equal(troughs, argrelextrema(values, np.less, order=3)[0])
+            peaks, troughs = peaks_troughs_distance(values, distance=3, backend='cpu')
+            assert np.array_equal(peaks, find_peaks(values, distance=3)[0])
+            assert np.array_equal(troughs, find_peaks(-values, distance=3)[0])
+    
+    def test_backend_selection(self):
+        """测试后端选择"""
+        values = np.random.randn(50)
+        peaks, troughs = local_extrema(values, order=3, backend='cpu')
+        assert isinstance(peaks, np.ndarray)
+        with pytest.raises(ValueError):
+            local_extrema(values, order=3, backend='opencl')
+        if not _extrema_gpu.GPU_AVAILABLE:
+            with pytest.raises(ImportError):
+                peaks_troughs_distance(values, distance=6, backend='cuda')
+
+
+class TestAverageTrueRange:
+    """测试 ATR 指标"""
+    
+    def test_constant_range(self):
+        """测试恒定波幅时 ATR 收敛到该波幅"""
+        close = np.full(30, 10.0)
+        atr = average_true_range(close + 0.5, close - 0.5, close, window=14)
+        assert len(atr) == 30
+        assert np.all(atr[:13] == 0)
+        assert np.allclose(atr[13:], 1.0)
+    
+    def test_short_series(self):
+        """测试序列短于窗口时全部为 0"""
+        close = np.arange(5, dtype=float)
+        atr = average_true_range(close + 1, close - 1, close, window=14)
+        assert np.all(atr == 0)
 
 
 class TestSDBocdpIntegration:
@@ -118,7 +277,61 @@ class TestSDBocdpIntegration:
         assert changepoints == []
         assert len(variances) == 0
         assert len(scores) == 0
-
+    
+    def test_run_length_truncation(self):
+        """测试运行长度分布截断后长度受限且概率和为 1"""
+        bocpd = BayesianOnlineChangePointDetection(
+            hazard_rate=0.01, threshold=0.9, max_len=2, max_run_length=5
+        )
+        for _ in range(20):
+            bocpd.update(0.3)
+        
+        assert len(bocpd.run_length_probs) == 5
+        assert bocpd.run_length_probs.sum() == pytest.approx(1.0)
+    
+    def test_reset_reuses_buffer(self):
+        """测试 reset 恢复初始分布且不重新分配缓冲区"""
+        bocpd = BayesianOnlineChangePointDetection(hazard_rate=0.1, threshold=0.9)
+        for _ in range(10):
+            bocpd.update(0.3)
+        buf = bocpd._buf
+        
+        bocpd.reset()
+        
+        assert bocpd._buf is buf
+        np.testing.assert_array_equal(bocpd.run_length_probs, [1.0])
+    
+    def test_kernel_matches_python_on_flat_starts(self, monkeypatch, flat_start_series):
+        """测试常数开头的随机序列上 Numba 内核与纯 Python 循环结果一致"""
+        from peak_valley_detector.core import score_driven_bocpd
+        expected = [rigorous_sd_bocpd(s, threshold=0.3) for s in flat_start_series]
+        monkeypatch.setattr(score_driven_bocpd, '_sd_bocpd', None)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            actual = [rigorous_sd_bocpd(s, threshold=0.3) for s in flat_start_series]
+        
+        assert any(len(cps) > 0 for cps, _, _ in expected)
+        for (cps, variances, scores), (cps_py, variances_py, scores_py) in zip(expected, actual):
+            assert cps == cps_py
+            np.testing.assert_allclose(variances, variances_py, rtol=1e-6)
+            np.testing.assert_allclose(scores, scores_py, rtol=1e-6)
+    
+    def test_stream_matches_python_batch_on_flat_starts(self, monkeypatch, flat_start_series):
+        """测试常数开头的随机序列上流式版本 (生成器输入) 与纯 Python 批量版本逐步一致"""
+        from peak_valley_detector.core import score_driven_bocpd
+        monkeypatch.setattr(score_driven_bocpd, '_sd_bocpd', None)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for series in flat_start_series:
+                changepoints, variances, scores = rigorous_sd_bocpd(series, threshold=0.3)
+                steps = list(stream_sd_bocpd(iter(series.tolist()), threshold=0.3))
+                
+                assert [t for t, _, _, _ in steps] == list(range(1, len(series)))
+                assert [t for t, _, _, is_cp in steps if is_cp] == changepoints
+                np.testing.assert_array_equal(
+                    np.array([v for _, _, v, _ in steps], dtype=np.float32), variances[1:]
+                )
+                np.testing.assert_array_equal(
+                    np.array([s for _, s, _, _ in steps], dtype=np.float32), scores[1:]
+                )
 
 if __name__ == "__main__":
     pytest.main([__file__])
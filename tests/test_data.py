@@ -0,0 +1,247 @@
+"""
+数据模块测试
+
+数据源接口 (akshare / gm.api) 以替身模块代替，不访问网络。
+"""
+
+import os
+import sys
+import threading
+import types
+
+import pytest
+import numpy as np
+import pandas as pd
+from peak_valley_detector.config import DataSourceConfig
+from peak_valley_detector.data import fetcher, sources
+from peak_valley_detector.data.fetcher import StockDataFetcher
+from peak_valley_detector.data.sources import (
+    AkShareSource, MyQuantSource, BaseDataSource, SOURCE_REGISTRY, clear_cache
+)
+
+
+@pytest.fixture
+def fake_akshare(monkeypatch):
+    """以替身模块代替 akshare，记录每次日线请求的参数"""
+    calls = []
+
+    def stock_zh_a_hist(**kwargs):
+        calls.append(kwargs)
+        return pd.DataFrame({
+            '日期': ['2024-01-03', '2024-01-02'],
+            '收盘': [10.5, 10.0], '最高': [11.0, 10.2], '最低': [10.1, 9.8],
+        })
+
+    module = types.ModuleType('akshare')
+    module.stock_zh_a_hist = stock_zh_a_hist
+    monkeypatch.setitem(sys.modules, 'akshare', module)
+    clear_cache()
+    yield calls
+    clear_cache()
+
+
+@pytest.fixture
+def fake_gm(monkeypatch):
+    """以替身模块代替 gm.api，history 返回预设的 list of dict"""
+    calls = []
+    rows = []
+
+    def history(**kwargs):
+        calls.append(kwargs)
+        return rows
+
+    api = types.ModuleType('gm.api')
+    api.history = history
+    api.set_token = lambda token: None
+    gm = types.ModuleType('gm')
+    gm.api = api
+    monkeypatch.setitem(sys.modules, 'gm', gm)
+    monkeypatch.setitem(sys.modules, 'gm.api', api)
+    clear_cache()
+    yield rows, calls
+    clear_cache()
+
+
+@pytest.fixture
+def disk_cache(tmp_path, monkeypatch):
+    """在临时目录开启磁盘缓存，返回缓存目录"""
+    monkeypatch.setattr(DataSourceConfig, 'is_cache_enabled', lambda self: True)
+    monkeypatch.setattr(DataSourceConfig, 'get_cache_dir', lambda self: str(tmp_path))
+    monkeypatch.setattr(DataSourceConfig, 'get_cache_ttl', lambda self: 3600.0)
+    return tmp_path
+
+
+class TestDiskCache:
+    """测试行情磁盘缓存"""
+
+    def test_hit_and_miss(self, fake_akshare, disk_cache):
+        """测试相同参数跨进程缓存命中，不同参数未命中"""
+        source = AkShareSource('000001')
+        first = source.get_hist('daily', '2024-01-01', None)
+        clear_cache()  # 清空进程内缓存，只剩磁盘缓存
+        second = source.get_hist('daily', '2024-01-01', None)
+
+        assert len(fake_akshare) == 1
+        pd.testing.assert_frame_equal(first, second)
+        assert first.index.is_monotonic_increasing
+
+        source.get_hist('daily', '2024-01-02', None)
+        assert len(fake_akshare) == 2
+        assert len(list(disk_cache.iterdir())) == 2
+
+    def test_ttl_expiry(self, fake_akshare, disk_cache):
+        """测试超过 cache_ttl 的缓存文件被重新请求"""
+        source = AkShareSource('000001')
+        source.get_hist('daily', '2024-01-01', None)
+        path, = disk_cache.iterdir()
+        stale = path.stat().st_mtime - 7200
+        os.utime(path, (stale, stale))
+        clear_cache()
+
+        source.get_hist('daily', '2024-01-01', None)
+        assert len(fake_akshare) == 2
+
+    def test_key_changes_with_date(self, fake_akshare, disk_cache, monkeypatch):
+        """测试跨日后 end_date 为空的请求不再读取前一天的缓存"""
+        class Tomorrow:
+            @staticmethod
+            def today():
+                return pd.Timestamp('2099-01-01').date()
+
+        source = AkShareSource('000001')
+        source.get_hist('daily', '2024-01-01', None)
+        clear_cache()
+        monkeypatch.setattr(sources, 'date', Tomorrow)
+        source.get_hist('daily', '2024-01-01', None)
+
+        assert len(fake_akshare) == 2
+
+    def test_disabled_by_default(self, fake_akshare, tmp_path, monkeypatch):
+        """测试未开启 cache_enabled 时不写磁盘"""
+        monkeypatch.chdir(tmp_path)
+        AkShareSource('000001').get_hist('daily', '2024-01-01', None)
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestMyQuantSource:
+    """测试掘金量化数据源的结果转换"""
+
+    def test_missing_fields_and_tz_aware_index(self, fake_gm):
+        """测试 None 字段记为 NaN，带时区的 eob 直接作为索引并按时间排序"""
+        import datetime as dt
+        from zoneinfo import ZoneInfo
+        rows, calls = fake_gm
+        tz = ZoneInfo('Asia/Shanghai')
+        rows.extend([
+            dict(eob=dt.datetime(2024, 1, 3, 15, tzinfo=tz), close=10.5, high=None, low=10.1),
+            dict(eob=dt.datetime(2024, 1, 2, 15, tzinfo=tz), close=10.0, high=10.2, low=None),
+        ])
+        df = MyQuantSource('600000').get_hist('daily', '2024-01-01')
+
+        assert calls[0]['symbol'] == 'SHSE.600000' and calls[0]['frequency'] == '1d'
+        assert str(df.index.tz) == 'Asia/Shanghai' and df.index.name == 'date'
+        assert df.index.is_monotonic_increasing
+        assert df.dtypes.eq(np.float64).all()
+        np.testing.assert_array_equal(df['close'], [10.0, 10.5])
+        np.testing.assert_array_equal(df['high'], [10.2, np.nan])
+        np.testing.assert_array_equal(df['low'], [np.nan, 10.1])
+
+    def test_empty_history(self, fake_gm):
+        """测试无数据时返回带列名的空表"""
+        df = MyQuantSource('000001').get_60min()
+        assert df.empty and list(df.columns) == ['close', 'high', 'low']
+        assert df.index.name == 'datetime'
+
+
+class StubSource(BaseDataSource):
+    """记录请求的数据源替身: ``failures[symbol]`` 次 OSError 后返回数据"""
+
+    calls = []
+    failures = {}
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def _request(self, kind):
+        cls = StubSource
+        with cls.lock:
+            cls.calls.append((kind, self.symbol))
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        try:
+            threading.Event().wait(0.005)  # 让并发请求有机会重叠
+            with cls.lock:
+                if cls.failures.get(self.symbol, 0) > 0:
+                    cls.failures[self.symbol] -= 1
+                    raise ConnectionError(f"{self.symbol} 请求失败")
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+        index = pd.date_range('2024-01-01', periods=20, freq='D', name='date')
+        return pd.DataFrame({'close': np.arange(20.0) + 10}, index=index)
+
+    def get_hist(self, period, start_date=None, end_date=None):
+        return self._request(period)
+
+    def get_60min(self, start_date=None, end_date=None):
+        return self._request('60min')
+
+
+@pytest.fixture
+def stub_fetcher(monkeypatch):
+    """使用替身数据源的 StockDataFetcher，time.sleep 记录等待时间而不真正等待"""
+    monkeypatch.setitem(SOURCE_REGISTRY, 'stub', StubSource)
+    monkeypatch.setattr(StubSource, 'calls', [])
+    monkeypatch.setattr(StubSource, 'failures', {})
+    monkeypatch.setattr(StubSource, 'max_in_flight', 0)
+    sleeps = []
+    monkeypatch.setattr(fetcher.time, 'sleep', sleeps.append)
+    return StockDataFetcher(source='stub', use_config_file=False), sleeps
+
+
+class TestDailyBatch:
+    """测试批量获取日线"""
+
+    def test_retries_with_backoff(self, stub_fetcher):
+        """测试网络错误按指数退避重试后成功"""
+        data_fetcher, sleeps = stub_fetcher
+        StubSource.failures['000001'] = 2
+        frames = data_fetcher.get_daily_batch(['000001'], retries=3, backoff=0.5)
+
+        assert StubSource.calls == [('daily', '000001')] * 3
+        assert sleeps == [0.5, 1.0]
+        assert len(frames['000001']) == 20
+
+    def test_reraises_after_retries(self, stub_fetcher):
+        """测试超过重试次数后抛出原异常"""
+        data_fetcher, sleeps = stub_fetcher
+        StubSource.failures['000001'] = 10
+        with pytest.raises(ConnectionError):
+            data_fetcher.get_daily_batch(['000001'], retries=2, backoff=0.1)
+
+        assert len(StubSource.calls) == 3
+        assert sleeps == [0.1, 0.2]
+
+    def test_order_dedup_and_concurrency(self, stub_fetcher):
+        """测试结果按输入顺序、重复代码只请求一次、在途请求受信号量限制"""
+        data_fetcher, _ = stub_fetcher
+        symbols = ['600000', '000001', '600000', '300750', '000002', '000001', '688001']
+        frames = data_fetcher.get_daily_batch(symbols, max_workers=8)
+
+        assert list(frames) == ['600000', '000001', '300750', '000002', '688001']
+        assert sorted(symbol for _, symbol in StubSource.calls) == sorted(frames)
+        assert StubSource.max_in_flight <= fetcher.MAX_CONCURRENT_REQUESTS
+
+
+class TestGetAll:
+    """测试日线 / 周线 / 60 分钟数据一次获取"""
+
+    def test_each_request_once(self, stub_fetcher):
+        """测试日线与 60 分钟各请求一次，周线由日线重采样得到"""
+        data_fetcher, _ = stub_fetcher
+        daily, weekly, h1 = data_fetcher.get_all('000001', '2024-01-01', '2024-01-20')
+
+        assert sorted(StubSource.calls) == [('60min', '000001'), ('daily', '000001')]
+        pd.testing.assert_series_equal(weekly, fetcher._weekly_close(daily))
+        pd.testing.assert_frame_equal(daily, data_fetcher.get_daily('000001'))
+        assert len(h1) == 20
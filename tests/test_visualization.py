@@ -0,0 +1,224 @@
+"""
+可视化模块测试
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+from peak_valley_detector.visualization.visualizer import (
+    MultiLayerVisualizer, _values_at, _simple_returns, _changepoint_coords
+)
+
+
+class TestPlotHelpers:
+    """测试绘图数据整理函数"""
+
+    def test_values_at_matches_loc(self, sine_series):
+        """测试按日期取值与 loc 一致，升序与乱序索引均可"""
+        dates = list(sine_series.index[[5, 0, 42, 42, 99]])
+        expected = sine_series.loc[dates].to_numpy()
+        np.testing.assert_array_equal(_values_at(sine_series, dates), expected)
+        shuffled = sine_series.iloc[np.random.RandomState(0).permutation(100)]
+        np.testing.assert_array_equal(_values_at(shuffled, dates), expected)
+
+    def test_values_at_missing_date(self, sine_series):
+        """测试日期不在索引中时抛出 KeyError"""
+        with pytest.raises(KeyError):
+            _values_at(sine_series, [pd.Timestamp('2030-01-01')])
+
+    def test_values_at_tz_aware_index(self, sine_series):
+        """测试带时区索引: 空日期列表与无时区日期均可取值"""
+        series = sine_series.tz_localize('Asia/Shanghai')
+        assert len(_values_at(series, [])) == 0
+        assert _values_at(series, [pd.Timestamp('2024-01-03')])[0] == series.iloc[2]
+        assert _values_at(series, [series.index[2].tz_convert('UTC')])[0] == series.iloc[2]
+
+    def test_prepare_extrema_empty_layers_tz_aware(self, sine_series):
+        """测试带时区数据下空极值层不报错"""
+        series = sine_series.tz_localize('Asia/Shanghai')
+        sources = {'macro': series, 'mid': series, 'micro': series}
+        coords = MultiLayerVisualizer._prepare_extrema(sources, dict(
+            macro_peaks=[series.index[10]], macro_troughs=[], mid_peaks=[],
+            mid_troughs=[], micro_peaks=[], micro_troughs=[],
+        ))
+        assert coords['macro_peaks'][1][0] == series.iloc[10]
+        assert all(len(coords[name][1]) == 0 for name in coords if name != 'macro_peaks')
+
+    def test_simple_returns_matches_pct_change(self):
+        """测试简单收益率与 pct_change().dropna() 一致"""
+        series = pd.Series([10.0, 11.0, np.nan, 12.0, 12.0, 9.0],
+                           index=pd.date_range('2024-01-01', periods=6))
+        expected = series.pct_change(fill_method=None).dropna()
+        dates, returns = _simple_returns(series)
+        assert dates.equals(expected.index)
+        np.testing.assert_array_equal(returns, expected.to_numpy())
+
+    def test_changepoint_coords(self, sine_series):
+        """测试变点坐标取值，超出序列长度的变点被忽略"""
+        dates, values = _changepoint_coords(sine_series, [3, 50, 100, 250])
+        assert dates.equals(sine_series.index[[3, 50]])
+        np.testing.assert_array_equal(values, sine_series.to_numpy()[[3, 50]])
+
+
+@pytest.fixture
+def multi_layer_data(sine_series):
+    """多层次图输入: 日线、周线、60 分钟数据及各层极值日期"""
+    daily = pd.DataFrame({'close': sine_series + 10})
+    weekly = daily['close'].resample('W-FRI').last()
+    h1 = pd.DataFrame({'收盘': daily['close'] * 1.01})
+    extrema = dict(
+        macro_peaks=list(weekly.index[[2, 8]]), macro_troughs=[],
+        mid_peaks=list(daily.index[[10, 40]]), mid_troughs=list(daily.index[[25]]),
+        micro_peaks=list(h1.index[[5]]), micro_troughs=list(h1.index[[60, 70]]),
+    )
+    return daily, weekly, h1, extrema
+
+
+class TestPrepareData:
+    """测试各图表的数据整理 (与绘图后端无关)"""
+
+    def test_prepare_multi_layer(self, multi_layer_data):
+        """测试多层次图数据: 收盘价与各层极值按所属层级取值"""
+        daily, weekly, h1, extrema = multi_layer_data
+        sources = {'macro': weekly, 'mid': daily['close'], 'micro': h1['收盘']}
+        data = MultiLayerVisualizer._prepare_multi_layer(daily, sources, extrema)
+
+        assert data['price'][0].equals(daily.index)
+        np.testing.assert_array_equal(data['price'][1], daily['close'].to_numpy())
+        assert set(data['extrema']) == set(extrema)
+        dates, values = data['extrema']['macro_peaks']
+        np.testing.assert_array_equal(values, weekly.loc[extrema['macro_peaks']].to_numpy())
+        dates, values = data['extrema']['micro_troughs']
+        np.testing.assert_array_equal(values, h1['收盘'].loc[extrema['micro_troughs']].to_numpy())
+        assert len(data['extrema']['macro_troughs'][1]) == 0
+
+    def test_prepare_changepoint_analysis(self, sine_series):
+        """测试变点分析图数据"""
+        data = MultiLayerVisualizer._prepare_changepoint_analysis(sine_series, [10, 60, 500])
+
+        assert data['n_changepoints'] == 3
+        assert data['changepoints'][0].equals(sine_series.index[[10, 60]])
+        dates, returns = data['returns']
+        assert len(dates) == len(returns) == len(sine_series) - 1
+
+    def test_prepare_score_driven_diagnostics(self, sine_series):
+        """测试诊断图数据，得分 / 方差为空时对应面板为 None"""
+        scores = np.arange(100, dtype=np.float32)
+        data = MultiLayerVisualizer._prepare_score_driven_diagnostics(
+            sine_series, scores, scores * 2, [5]
+        )
+        assert data['scores'][0].equals(sine_series.index[1:])
+        np.testing.assert_array_equal(data['variances'][1], scores[1:] * 2)
+
+        empty = np.array([], dtype=np.float32)
+        data = MultiLayerVisualizer._prepare_score_driven_diagnostics(sine_series, empty, empty, [])
+        assert data['scores'] is None and data['variances'] is None
+        assert data['n_changepoints'] == 0
+
+
+class TestBackends:
+    """绘图后端冒烟测试"""
+
+    def _plot_all(self, visualizer, multi_layer_data, sine_series):
+        daily, weekly, h1, extrema = multi_layer_data
+        visualizer.plot_multi_layer_results('000001', daily, weekly, h1, **extrema)
+        visualizer.plot_changepoint_analysis(sine_series, [10, 60])
+        scores = np.linspace(0, 1, 100)
+        visualizer.plot_score_driven_diagnostics(sine_series, scores, scores, [10])
+
+    def test_matplotlib_backend(self, multi_layer_data, sine_series, monkeypatch):
+        """测试 matplotlib 后端绘制全部图表"""
+        matplotlib = pytest.importorskip("matplotlib")
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        monkeypatch.setattr(plt, 'show', lambda *args, **kwargs: None)
+        try:
+            self._plot_all(MultiLayerVisualizer(), multi_layer_data, sine_series)
+            assert len(plt.get_fignums()) == 3
+        finally:
+            plt.close('all')
+
+    def test_bokeh_backend(self, multi_layer_data, sine_series, monkeypatch):
+        """测试 bokeh 后端绘制全部图表"""
+        pytest.importorskip("bokeh")
+        import bokeh.plotting
+        shown = []
+        monkeypatch.setattr(bokeh.plotting, 'show', lambda obj, *args, **kwargs: shown.append(obj))
+        self._plot_all(MultiLayerVisualizer(backend='bokeh'), multi_layer_data, sine_series)
+        assert len(shown) == 3
+
+    def test_unknown_backend(self):
+        """测试未知后端报错"""
+        with pytest.raises(ValueError):
+            MultiLayerVisualizer(backend='plotly')
+
+
+class TestIncrementalUpdate:
+    """测试多层次图的增量更新 (matplotlib Agg 画布)"""
+
+    @pytest.fixture
+    def plotted(self, multi_layer_data, monkeypatch):
+        """绘制一张多层次图，返回可视化器与输入数据；宏观层含一个远高于价格的点"""
+        matplotlib = pytest.importorskip("matplotlib")
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        monkeypatch.setattr(plt, 'show', lambda *args, **kwargs: None)
+        daily, weekly, h1, extrema = multi_layer_data
+        weekly = weekly.copy()
+        weekly.iloc[-1] = 100.0
+        visualizer = MultiLayerVisualizer()
+        visualizer.plot_multi_layer_results('000001', daily, weekly, h1, **extrema)
+        yield visualizer, daily, weekly, h1, extrema
+        plt.close('all')
+
+    @staticmethod
+    def _legend_labels(visualizer):
+        return [text.get_text() for text in visualizer._live['ax'].get_legend().get_texts()]
+
+    def test_update_within_and_outside_view(self, plotted):
+        """测试视图内更新复用缓存背景 (blit)，超出视图时重新缩放并重绘"""
+        visualizer, daily, weekly, h1, extrema = plotted
+        live = visualizer._live
+        markers = live['markers']
+        assert live['background'] is None
+        assert 'Macro Trough (SD-BOCPD)' not in self._legend_labels(visualizer)
+
+        # 首次更新尚无背景，整体重绘并缓存背景；宏观谷值层由空变为非空，图例随之更新
+        update = dict(extrema, macro_troughs=list(weekly.index[[4]]))
+        visualizer.update_multi_layer_results(**update)
+        background = live['background']
+        assert background is not None
+        assert 'Macro Trough (SD-BOCPD)' in self._legend_labels(visualizer)
+
+        # 视图内更新: 各层是否为空不变，沿用缓存背景与坐标范围
+        ylim = live['ax'].get_ylim()
+        update = dict(update, mid_peaks=list(daily.index[[12, 44, 80]]))
+        visualizer.update_multi_layer_results(**update)
+        assert live['background'] is background
+        assert live['ax'].get_ylim() == ylim
+        np.testing.assert_array_equal(
+            markers['mid_peaks'].get_ydata(), daily['close'].iloc[[12, 44, 80]].to_numpy()
+        )
+
+        # 超出视图: 重新缩放坐标范围并重新缓存背景
+        update = dict(update, macro_peaks=list(weekly.index[[2, -1]]))
+        visualizer.update_multi_layer_results(**update)
+        assert live['ax'].get_ylim()[1] >= 100.0
+        assert live['background'] is not None and live['background'] is not background
+        np.testing.assert_array_equal(markers['macro_peaks'].get_ydata(), weekly.iloc[[2, -1]])
+
+    def test_empty_micro_layer_hides_right_axis(self, plotted):
+        """测试微观层为空时隐藏右轴，图例不含微观层"""
+        visualizer, daily, weekly, h1, extrema = plotted
+        visualizer.update_multi_layer_results(**dict(extrema, micro_peaks=[], micro_troughs=[]))
+        assert not visualizer._live['ax2'].get_visible()
+        assert len(visualizer._live['markers']['micro_troughs'].get_xdata()) == 0
+        assert self._legend_labels(visualizer)[0] == 'Close Price'
+
+    def test_update_requires_plot(self, multi_layer_data):
+        """测试未绘图或非 matplotlib 后端时更新报错"""
+        extrema = multi_layer_data[3]
+        with pytest.raises(RuntimeError):
+            MultiLayerVisualizer().update_multi_layer_results(**extrema)
+        with pytest.raises(ValueError):
+            MultiLayerVisualizer(backend='bokeh').update_multi_layer_results(**extrema)